@@ -0,0 +1,104 @@
+from typing import Dict, List, Any, Set
+
+import numpy as np
+
+# Limite abaixo do qual o estoque de uma venda é considerado baixo
+LIMITE_ESTOQUE_BAIXO = 10
+
+
+def montar_resumo(
+    num_vendas: int,
+    total_vendas: float,
+    total_produtos: int,
+    total_lucro: float,
+    num_clientes: int,
+    estoque_total: int,
+    produtos_baixo_estoque: int
+) -> Dict[str, Any]:
+    """Resumo no formato usado pelo endpoint de vendas, a partir dos totais de um grupo."""
+    media_valor = total_vendas / num_vendas if num_vendas > 0 else 0
+    margem_lucro = (total_lucro / total_vendas * 100) if total_vendas > 0 else 0
+    return {
+        "total_vendas": float(total_vendas),
+        "total_produtos": int(total_produtos),
+        "media_valor": float(media_valor),
+        "num_clientes": int(num_clientes),
+        "total_lucro": float(total_lucro),
+        "margem_lucro": float(margem_lucro),
+        "estoque_total": int(estoque_total),
+        "produtos_baixo_estoque": int(produtos_baixo_estoque)
+    }
+
+
+class AgregadoVendas:
+    """Totais de um grupo de vendas (região ou estado), atualizados de forma incremental."""
+
+    def __init__(self):
+        self.num_vendas = 0
+        self.total_vendas = 0.0
+        self.total_produtos = 0
+        self.total_lucro = 0.0
+        self.estoque_total = 0
+        self.produtos_baixo_estoque = 0
+        self.clientes: Set[int] = set()
+        # Código do produto -> estoque da primeira venda vista desse produto
+        self.estoque_por_produto: Dict[int, int] = {}
+
+    def acumular(self, colunas: Dict[str, np.ndarray]) -> None:
+        """Soma um lote de linhas (colunas NumPy) aos totais, sem reprocessar as anteriores."""
+        if not len(colunas["id"]):
+            return
+        estoque = colunas["estoque_atual"]
+        self.num_vendas += len(colunas["id"])
+        self.total_vendas += float(colunas["valor"].sum())
+        self.total_produtos += int(colunas["quantidade"].sum())
+        self.total_lucro += float(colunas["lucro"].sum())
+        self.estoque_total += int(estoque.sum())
+        self.produtos_baixo_estoque += int(np.count_nonzero(estoque < LIMITE_ESTOQUE_BAIXO))
+        self.clientes.update(np.unique(colunas["cliente"]).tolist())
+
+        # Respeitar a ordem da primeira aparição de cada produto
+        produtos, primeiras = np.unique(colunas["produto"], return_index=True)
+        ordem = np.argsort(primeiras)
+        for produto, indice in zip(produtos[ordem].tolist(), primeiras[ordem].tolist()):
+            if produto not in self.estoque_por_produto:
+                self.estoque_por_produto[produto] = int(estoque[indice])
+
+    def resumo(self) -> Dict[str, Any]:
+        """Retorna o resumo no formato usado pelo endpoint de vendas."""
+        return montar_resumo(
+            self.num_vendas, self.total_vendas, self.total_produtos, self.total_lucro,
+            len(self.clientes), self.estoque_total, self.produtos_baixo_estoque
+        )
+
+
+class AgregadosPorGrupo:
+    """Mantém um AgregadoVendas por região e por estado."""
+
+    def __init__(self):
+        self.por_regiao: Dict[str, AgregadoVendas] = {}
+        self.por_estado: Dict[int, AgregadoVendas] = {}
+
+    def acumular(self, regiao: str, colunas: Dict[str, np.ndarray]) -> None:
+        """Atualiza os agregados da região e dos estados presentes no lote."""
+        self.por_regiao.setdefault(regiao, AgregadoVendas()).acumular(colunas)
+
+        estados = colunas["estado"]
+        for codigo in np.unique(estados).tolist():
+            mascara = estados == codigo
+            self.por_estado.setdefault(codigo, AgregadoVendas()).acumular(
+                {nome: coluna[mascara] for nome, coluna in colunas.items()}
+            )
+
+    def regiao(self, regiao: str) -> AgregadoVendas:
+        return self.por_regiao.get(regiao) or AgregadoVendas()
+
+    def estado(self, codigo: int) -> AgregadoVendas:
+        return self.por_estado.get(codigo) or AgregadoVendas()
+
+    def estoque(self, regiao: str, produtos: List[str]) -> List[Dict[str, Any]]:
+        """Dados do gráfico de estoque da região (nomes de produto já decodificados)."""
+        return [
+            {"produto": produtos[codigo], "estoque": estoque}
+            for codigo, estoque in self.regiao(regiao).estoque_por_produto.items()
+        ]
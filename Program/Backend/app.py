@@ -1,16 +1,63 @@
-from fastapi import FastAPI
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from config import ENVIRONMENT, STATIC_DIR, HOST, PORT
-from routes import chat_router, vendas_router
+from config import (
+    ENVIRONMENT, STATIC_DIR, HOST, PORT, AQUECER_NA_INICIALIZACAO, DATASTORE_RECARGA_INTERVALO, VENDAS_FONTE
+)
+from logs import configurar_logging
+from metricas import requisicoes_http, duracao_http
+from routes import chat_router, vendas_router, sistema_router, metricas_router
+from services import llama_service, chat_service
+from data_store import obter_data_store, data_store_carregado
+from prontidao import prontidao
+from recarga_vendas import RecargaVendas
+import banco
+
+def _aquecer_banco():
+    with banco.nova_sessao():
+        pass
+
+# Subsistemas pesados, aquecidos em segundo plano (estado em /api/sistema/prontidao)
+prontidao.registrar("banco", _aquecer_banco, lambda: banco.metricas_pool.sessoes > 0)
+if VENDAS_FONTE == "memoria":
+    prontidao.registrar("data_store", obter_data_store, data_store_carregado)
+prontidao.registrar("indice_vetorial", lambda: llama_service.indice, lambda: llama_service.indice_carregado)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da aplicação: ao iniciar, aquece os subsistemas em segundo plano (o servidor
+    já aceita conexões) e passa a acompanhar o CSV de vendas; ao desligar, grava as mensagens
+    pendentes e libera as conexões.
+    """
+    if AQUECER_NA_INICIALIZACAO:
+        threading.Thread(target=prontidao.aquecer_todos, name="aquecimento", daemon=True).start()
+    # No modo banco o DataStore não é usado (nem carregado)
+    recarga = None
+    if VENDAS_FONTE == "memoria" and DATASTORE_RECARGA_INTERVALO > 0:
+        recarga = RecargaVendas(DATASTORE_RECARGA_INTERVALO)
+        recarga.iniciar()
+    yield
+    if recarga is not None:
+        recarga.parar()
+    await llama_service.cliente.fechar()
+    if chat_service.escrita is not None:
+        chat_service.escrita.parar()
+    banco.engine.dispose()
 
 def create_app() -> FastAPI:
     """Cria e configura a aplicação FastAPI."""
+    configurar_logging()
     app = FastAPI(
         title="CodeSellers Vendas API",
         description="API para o sistema de vendas CodeSellers.",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
     
     # Configurar CORS
@@ -22,9 +69,25 @@ def create_app() -> FastAPI:
         allow_headers=["*"],  # Permite todos os cabeçalhos
     )
     
+    # Latência e contagem de requisições por rota (o modelo da rota, ex.: /api/chats/{chat_id})
+    @app.middleware("http")
+    async def medir_requisicao(request: Request, call_next):
+        inicio = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            rota = getattr(request.scope.get("route"), "path", "desconhecida")
+            duracao_http.observar(time.perf_counter() - inicio, rota=rota, metodo=request.method)
+            requisicoes_http.inc(rota=rota, metodo=request.method, status=status)
+    
     # Incluir rotas
     app.include_router(chat_router)
     app.include_router(vendas_router)
+    app.include_router(sistema_router)
+    app.include_router(metricas_router)
     
     # Montar arquivos estáticos em produção
     if ENVIRONMENT == "production" and STATIC_DIR:
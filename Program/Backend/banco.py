@@ -0,0 +1,131 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Session, create_engine
+
+from config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS, DB_ECHO
+)
+from metricas import registro, Coletada, instrumentar_banco
+
+
+def criar_engine(url: str = DATABASE_URL, echo: bool = DB_ECHO) -> Engine:
+    """Cria um engine com o pool configurado (PostgreSQL: fuso horário e statement_timeout por conexão)."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return create_engine(url, echo=echo, connect_args={"check_same_thread": False})
+
+    opcoes = "-c TimeZone=America/Sao_Paulo"
+    if DB_STATEMENT_TIMEOUT_MS:
+        opcoes += f" -c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(
+        url,
+        echo=echo,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={
+            "client_encoding": "UTF8",
+            "options": opcoes
+        }
+    )
+
+
+class MetricasPool:
+    """Conta as conexões obtidas do pool e o tempo de espera por elas."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.sessoes = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def registrar_espera(self, segundos: float) -> None:
+        with self._trava:
+            self.sessoes += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+    def resumo(self, engine: Engine) -> Dict[str, Any]:
+        pool = engine.pool
+        em_uso = pool.checkedout() if hasattr(pool, "checkedout") else None
+        return {
+            "tamanho": pool.size() if hasattr(pool, "size") else None,
+            "em_uso": em_uso,
+            "livres": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "sessoes": self.sessoes,
+            "espera_media_ms": self.espera_total / self.sessoes * 1000 if self.sessoes else 0.0,
+            "espera_maxima_ms": self.espera_maxima * 1000,
+        }
+
+
+# Métricas únicas do processo; o engine (`banco.engine`) é criado no primeiro uso,
+# para que importar este módulo não carregue o driver do banco. Atribuir banco.engine
+# (como fazem os benchmarks) substitui o engine do processo.
+instrumentar_banco()
+metricas_pool = MetricasPool()
+_trava_engine = threading.Lock()
+
+
+def obter_engine() -> Engine:
+    """Engine único do processo, criado na primeira chamada."""
+    with _trava_engine:
+        if "engine" not in globals():
+            globals()["engine"] = criar_engine()
+        return globals()["engine"]
+
+
+def __getattr__(nome: str):
+    if nome == "engine":
+        return obter_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+def _abrir_sessao() -> Session:
+    """Abre uma sessão já com a conexão obtida, medindo a espera pelo pool."""
+    session = Session(obter_engine())
+    inicio = time.perf_counter()
+    session.connection()
+    metricas_pool.registrar_espera(time.perf_counter() - inicio)
+    return session
+
+
+@contextmanager
+def nova_sessao() -> Iterator[Session]:
+    """Sessão para uso fora de uma requisição (tarefas em segundo plano, scripts)."""
+    session = _abrir_sessao()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def obter_sessao() -> Iterator[Session]:
+    """Dependência do FastAPI: uma sessão por requisição, devolvida ao pool ao final."""
+    with nova_sessao() as session:
+        yield session
+
+
+def estatisticas_pool() -> Dict[str, Any]:
+    """Estado atual do pool de conexões e tempos de espera acumulados."""
+    return metricas_pool.resumo(obter_engine())
+
+
+def _coletar_pool():
+    resumo = estatisticas_pool()
+    return [((estado,), resumo[estado]) for estado in ("tamanho", "em_uso", "livres", "overflow")]
+
+
+registro.registrar(Coletada(
+    "db_pool_conexoes", "Conexões do pool do banco por estado.", "gauge", ("estado",), _coletar_pool
+))
+registro.registrar(Coletada(
+    "db_pool_espera_segundos_total", "Tempo total de espera por uma conexão do pool.", "counter", (),
+    lambda: [((), metricas_pool.espera_total)]
+))
@@ -0,0 +1 @@
+"""Benchmarks do backend (executar a partir da pasta Backend, ex.: python -m benchmarks.bench_memoria)."""
@@ -0,0 +1,67 @@
+"""Utilitários compartilhados pelos benchmarks: servidores em thread e banco SQLite temporário."""
+import os
+import tempfile
+import threading
+import time
+
+import uvicorn
+
+CSV_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dadosdosprodutos.csv")
+
+
+def preparar_banco_sqlite(caminho_csv: str = CSV_PADRAO):
+    """Cria um banco SQLite temporário com as tabelas do sistema e a tabela Vendas preenchida."""
+    import pandas as pd
+    from sqlmodel import SQLModel, Session
+    from banco import criar_engine
+    from models import Vendas  # (o módulo registra também Chat e Message no metadata)
+
+    engine = criar_engine(f"sqlite:///{tempfile.mkdtemp()}/vendas.db")
+    SQLModel.metadata.create_all(engine)
+    df = pd.read_csv(caminho_csv, sep=';', decimal=',')
+    df.columns = df.columns.str.lower()
+    df['data_venda'] = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce').dt.date
+    registros = [
+        Vendas(**{k: (None if pd.isna(v) else v) for k, v in linha.items() if k in Vendas.__annotations__})
+        for linha in df.to_dict('records')
+    ]
+    with Session(engine) as session:
+        session.add_all(registros)
+        session.commit()
+    return engine
+
+
+def percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def resumo_latencias(latencias) -> dict:
+    """p50, p99, média e máximo (em ms) de uma lista de latências em segundos."""
+    return {
+        "amostras": len(latencias),
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "media_ms": sum(latencias) / len(latencias) * 1000,
+        "max_ms": max(latencias) * 1000,
+    }
+
+
+class ServidorEmThread:
+    """Executa uma aplicação ASGI com uvicorn em uma thread separada."""
+
+    def __init__(self, app, porta: int):
+        config = uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning")
+        self.servidor = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.servidor.run, daemon=True)
+        self.url = f"http://127.0.0.1:{porta}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.servidor.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *args):
+        self.servidor.should_exit = True
+        self.thread.join()
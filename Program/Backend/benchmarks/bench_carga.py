@@ -0,0 +1,70 @@
+"""
+Mede o tempo de carga do DataStore e o ganho da resolução de estados por índice.
+
+Uso:
+    python -m benchmarks.bench_carga [1000000]
+
+Compara a busca antiga (dict recriado a cada acesso + laço sobre os 27 estados por linha)
+com o índice de nomes normalizados (codigo_estado), sobre a coluna 'estado' do CSV gerado.
+"""
+import csv
+import os
+import sys
+import time
+from typing import Dict, Any, Optional
+
+from benchmarks.dados_sinteticos import gerar_csv
+from data_store import DataStore, NOME_ESTADO, codigo_estado
+
+
+def _codigo_estado_antigo(estado: str) -> Optional[str]:
+    """Reproduz a busca antiga: a propriedade recriava o dict e o laço comparava nome a nome."""
+    for codigo, nome in dict(NOME_ESTADO).items():
+        if nome.lower() == estado.lower() or nome.replace(' ', '').lower() == estado.lower():
+            return codigo
+    return None
+
+
+def medir(num_linhas: int) -> Dict[str, Any]:
+    """Mede a carga completa e a resolução de estados para um CSV sintético com num_linhas vendas."""
+    caminho = gerar_csv(num_linhas)
+
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=';')
+        indice_estado = next(leitor).index('estado')
+        estados = [linha[indice_estado] for linha in leitor]
+
+    inicio = time.perf_counter()
+    for estado in estados:
+        _codigo_estado_antigo(estado)
+    tempo_antigo = time.perf_counter() - inicio
+
+    codigo_estado.cache_clear()
+    inicio = time.perf_counter()
+    for estado in estados:
+        codigo_estado(estado)
+    tempo_indice = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    store = DataStore(caminho, diretorio_snapshot=None)
+    tempo_carga = time.perf_counter() - inicio
+    num_vendas = sum(len(store.get_dados_regiao(regiao)) for regiao in store.get_regioes())
+    os.remove(caminho)
+
+    return {
+        "linhas": num_vendas,
+        "carga_s": tempo_carga,
+        "linhas_por_s": num_vendas / tempo_carga if tempo_carga else 0.0,
+        "estados_antigo_s": tempo_antigo,
+        "estados_indice_s": tempo_indice,
+        "ganho_estados": tempo_antigo / tempo_indice if tempo_indice else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    num_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    r = medir(num_linhas)
+    print(f"Linhas carregadas:            {r['linhas']}")
+    print(f"Carga do DataStore:           {r['carga_s']:.2f} s ({r['linhas_por_s']:.0f} linhas/s)")
+    print(f"Resolução de estados (antiga): {r['estados_antigo_s']:.2f} s")
+    print(f"Resolução de estados (índice): {r['estados_indice_s']:.2f} s ({r['ganho_estados']:.1f}x mais rápida)")
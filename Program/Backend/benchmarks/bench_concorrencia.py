@@ -0,0 +1,105 @@
+"""
+Teste de carga: latência de /api/vendas/* com e sem chats em andamento.
+
+Sobe um Ollama falso (com atraso de geração configurável) e a aplicação real com uvicorn,
+usando um banco SQLite temporário com as vendas de dadosdosprodutos.csv. Mede p50/p99 das
+rotas de vendas primeiro sozinhas e depois com consultas ao chat rodando em paralelo.
+
+Uso:
+    python -m benchmarks.bench_concorrencia [num_requisicoes] [chats_simultaneos] [atraso_llm_s]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.ambiente import ServidorEmThread, percentil, preparar_banco_sqlite
+
+PORTA_OLLAMA = 11435
+PORTA_APP = 8765
+
+
+async def _medir_vendas(cliente, url: str, num_requisicoes: int, concorrencia: int = 4) -> List[float]:
+    latencias: List[float] = []
+    fila = asyncio.Queue()
+    for _ in range(num_requisicoes):
+        fila.put_nowait(None)
+
+    async def trabalhador():
+        while not fila.empty():
+            fila.get_nowait()
+            inicio = time.perf_counter()
+            resposta = await cliente.get(url)
+            resposta.raise_for_status()
+            latencias.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    return latencias
+
+
+async def _chats_continuos(cliente, url: str, parar: asyncio.Event, contagem: Dict[str, int]):
+    while not parar.is_set():
+        resposta = await cliente.post(url, json={"message": "Qual região teve mais lucro?"})
+        contagem["status_" + str(resposta.status_code)] = contagem.get("status_" + str(resposta.status_code), 0) + 1
+
+
+async def _executar(url_app: str, num_requisicoes: int, chats_simultaneos: int) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    url_vendas = f"{url_app}/api/vendas/dados/Sudeste"
+    resultado = {}
+    async with httpx.AsyncClient(timeout=600) as cliente:
+        await _medir_vendas(cliente, url_vendas, 20)  # aquecimento
+        sozinho = await _medir_vendas(cliente, url_vendas, num_requisicoes)
+
+        parar = asyncio.Event()
+        contagem: Dict[str, int] = {}
+        chats = [
+            asyncio.create_task(_chats_continuos(cliente, f"{url_app}/api/query", parar, contagem))
+            for _ in range(chats_simultaneos)
+        ]
+        await asyncio.sleep(0.5)
+        com_chats = await _medir_vendas(cliente, url_vendas, num_requisicoes)
+        parar.set()
+        await asyncio.gather(*chats)
+
+    for nome, latencias in (("sem_chats", sozinho), ("com_chats", com_chats)):
+        resultado[nome] = {
+            "p50_ms": percentil(latencias, 50) * 1000,
+            "p99_ms": percentil(latencias, 99) * 1000,
+            "max_ms": max(latencias) * 1000,
+        }
+    resultado["chats"] = contagem
+    return resultado
+
+
+def main(num_requisicoes: int = 300, chats_simultaneos: int = 8, atraso_llm: float = 2.0):
+    diretorio = tempfile.mkdtemp()
+    os.environ["OLLAMA_API_URL"] = f"http://127.0.0.1:{PORTA_OLLAMA}"
+    # Perguntas repetidas: sem o cache de respostas, toda consulta chega ao LLM
+    os.environ["CACHE_RESPOSTAS_MAX_ITENS"] = "0"
+    os.environ.setdefault("INDICE_VETORIAL_DIR", os.path.join(diretorio, "indice"))
+
+    import banco
+    from app import create_app
+    from benchmarks.ollama_falso import criar_app_ollama
+
+    banco.engine = preparar_banco_sqlite()
+
+    with ServidorEmThread(criar_app_ollama(atraso_llm), PORTA_OLLAMA), \
+            ServidorEmThread(create_app(), PORTA_APP) as app:
+        resultado = asyncio.run(_executar(app.url, num_requisicoes, chats_simultaneos))
+
+    print(f"{'cenário':<12} {'p50 (ms)':>10} {'p99 (ms)':>10} {'máx (ms)':>10}")
+    for nome in ("sem_chats", "com_chats"):
+        r = resultado[nome]
+        print(f"{nome:<12} {r['p50_ms']:>10.1f} {r['p99_ms']:>10.1f} {r['max_ms']:>10.1f}")
+    print(f"Respostas do chat durante o teste: {resultado['chats']}")
+    return resultado
+
+
+if __name__ == "__main__":
+    argumentos = [float(arg) for arg in sys.argv[1:]]
+    main(*(int(a) if i < 2 else a for i, a in enumerate(argumentos)))
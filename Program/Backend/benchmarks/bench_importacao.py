@@ -0,0 +1,78 @@
+"""
+Mede a vazão (linhas/s) da importação do CSV para a tabela Vendas.
+
+Uso:
+    python -m benchmarks.bench_importacao [5000000]
+
+Importa a amostra dadosdosprodutos.csv (1000 linhas) com o importador antigo (ORM, lotes
+de 100) e com importar_csv_em_massa, e depois um CSV sintético com o número de linhas
+pedido apenas com o importador em massa. Usa um SQLite temporário (executemany); defina
+BENCH_DATABASE_URL com uma URL PostgreSQL para medir o caminho com COPY FROM STDIN.
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Any
+
+from sqlmodel import SQLModel
+
+import importar_csv
+from banco import criar_engine
+from benchmarks.ambiente import CSV_PADRAO
+from benchmarks.dados_sinteticos import gerar_csv
+
+
+def _novo_banco():
+    url = os.environ.get("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/vendas.db"
+    engine = criar_engine(url)
+    SQLModel.metadata.drop_all(engine, tables=importar_csv.TABELAS_IMPORTACAO)
+    SQLModel.metadata.create_all(engine, tables=importar_csv.TABELAS_IMPORTACAO)
+    return engine
+
+
+def _medir_antigo(caminho: str) -> float:
+    """Importa com a função antiga (índice vetorial desligado durante a medição)."""
+    engine = _novo_banco()
+    atualizar_indice = importar_csv.atualizar_indice_vetorial
+    importar_csv.atualizar_indice_vetorial = lambda engine: None
+    try:
+        inicio = time.perf_counter()
+        importar_csv.importar_csv(caminho, engine=engine)
+        return time.perf_counter() - inicio
+    finally:
+        importar_csv.atualizar_indice_vetorial = atualizar_indice
+
+
+def _medir_em_massa(caminho: str) -> Dict[str, Any]:
+    rejeitos = os.path.join(tempfile.mkdtemp(), "rejeitados.csv")
+    return importar_csv.importar_csv_em_massa(caminho, _novo_banco(), rejeitos, atualizar_indice=False)
+
+
+def medir(num_linhas: int) -> Dict[str, Any]:
+    linhas_amostra = sum(1 for _ in open(CSV_PADRAO, encoding='utf-8')) - 1
+    tempo_antigo = _medir_antigo(CSV_PADRAO)
+    amostra = _medir_em_massa(CSV_PADRAO)
+
+    caminho = gerar_csv(num_linhas)
+    try:
+        sintetico = _medir_em_massa(caminho)
+    finally:
+        os.remove(caminho)
+
+    return {
+        "amostra_antigo_linhas_por_s": linhas_amostra / tempo_antigo,
+        "amostra_em_massa_linhas_por_s": amostra["linhas_por_segundo"],
+        "sintetico_linhas": sintetico["linhas_importadas"],
+        "sintetico_s": sintetico["segundos"],
+        "sintetico_linhas_por_s": sintetico["linhas_por_segundo"],
+    }
+
+
+if __name__ == "__main__":
+    num_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    r = medir(num_linhas)
+    print(f"Amostra (1000 linhas), importador antigo:   {r['amostra_antigo_linhas_por_s']:.0f} linhas/s")
+    print(f"Amostra (1000 linhas), importador em massa: {r['amostra_em_massa_linhas_por_s']:.0f} linhas/s")
+    print(f"Sintético ({r['sintetico_linhas']} linhas), em massa: "
+          f"{r['sintetico_s']:.1f} s ({r['sintetico_linhas_por_s']:.0f} linhas/s)")
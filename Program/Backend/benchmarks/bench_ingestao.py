@@ -0,0 +1,50 @@
+"""
+Verifica que a memória de pico da importação em lotes não cresce com o tamanho do CSV.
+
+Uso:
+    python -m benchmarks.bench_ingestao 100000 1000000 3000000
+
+Cada tamanho é importado (importar_csv_em_massa, SQLite temporário) em um processo
+separado, pois o pico de RSS é medido por processo.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.dados_sinteticos import gerar_csv
+
+
+def _importar(caminho: str) -> None:
+    """Executado no processo filho: importa o CSV e imprime as estatísticas em JSON."""
+    from sqlmodel import SQLModel, create_engine
+    import importar_csv
+
+    engine = create_engine(f"sqlite:///{tempfile.mkdtemp()}/vendas.db")
+    SQLModel.metadata.create_all(engine, tables=importar_csv.TABELAS_IMPORTACAO)
+    estatisticas = importar_csv.importar_csv_em_massa(caminho, engine, atualizar_indice=False)
+    print(json.dumps(estatisticas))
+
+
+def medir(num_linhas: int) -> dict:
+    caminho = gerar_csv(num_linhas)
+    try:
+        saida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_ingestao", "--importar", caminho],
+            capture_output=True, text=True, check=True
+        ).stdout
+    finally:
+        os.remove(caminho)
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--importar"]:
+        _importar(sys.argv[2])
+        sys.exit(0)
+    tamanhos = [int(n) for n in sys.argv[1:]] or [100_000, 1_000_000]
+    print(f"{'linhas':>10} {'linhas/s':>10} {'RSS pico (MB)':>14}")
+    for num_linhas in tamanhos:
+        r = medir(num_linhas)
+        print(f"{r['linhas_importadas']:>10} {r['linhas_por_segundo']:>10.0f} {r['memoria_pico_mb']:>14.0f}")
@@ -0,0 +1,81 @@
+"""
+Mede o tempo de inicialização da aplicação num processo novo.
+
+Uso:
+    python -m benchmarks.bench_inicializacao [caminho.csv]
+
+Em um subprocesso, mede: a importação de app.py, o tempo até /api/sistema/prontidao
+responder 200 (DataStore, índice vetorial e banco aquecidos em segundo plano) e até a
+primeira resposta de /api/vendas/dados/{regiao}. Roda duas vezes: com o snapshot binário
+do DataStore já gravado e sem snapshot (CSV reprocessado).
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+from benchmarks.ambiente import CSV_PADRAO
+
+
+def _medir_neste_processo() -> Dict[str, Any]:
+    """Executado no subprocesso: tempos desde antes da importação da aplicação."""
+    inicio = time.perf_counter()
+    from app import create_app
+    importacao = time.perf_counter() - inicio
+
+    from fastapi.testclient import TestClient
+    with TestClient(create_app()) as cliente:
+        primeira = cliente.get("/api/vendas/dados/Sudeste", params={"limite": 10})
+        primeira.raise_for_status()
+        primeira_requisicao = time.perf_counter() - inicio
+        while cliente.get("/api/sistema/prontidao").status_code != 200:
+            time.sleep(0.01)
+        pronto = time.perf_counter() - inicio
+        subsistemas = cliente.get("/api/sistema/prontidao").json()["subsistemas"]
+    return {
+        "importar_app_s": importacao,
+        "primeira_requisicao_vendas_s": primeira_requisicao,
+        "pronto_s": pronto,
+        "aquecimento_s": {nome: estado.get("segundos") for nome, estado in subsistemas.items()},
+    }
+
+
+def medir(caminho_csv: str = CSV_PADRAO, diretorio_snapshot: Optional[str] = None) -> Dict[str, Any]:
+    """Inicia a aplicação num subprocesso; diretorio_snapshot vazio desliga o snapshot."""
+    diretorio = tempfile.mkdtemp()
+    ambiente = dict(
+        os.environ,
+        DATASTORE_CSV=caminho_csv,
+        DATASTORE_SNAPSHOT_DIR=diretorio_snapshot if diretorio_snapshot is not None else os.path.join(diretorio, "snapshot"),
+        INDICE_VETORIAL_DIR=os.environ.get("INDICE_VETORIAL_DIR", os.path.join(diretorio, "indice")),
+        DATABASE_URL=os.environ.get("BENCH_DATABASE_URL") or f"sqlite:///{diretorio}/vendas.db",
+        LOG_NIVEL="WARNING",
+    )
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_inicializacao", "--processo-filho"],
+        env=ambiente, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    resultado["processo_s"] = time.perf_counter() - inicio
+    return resultado
+
+
+def medir_com_e_sem_snapshot(caminho_csv: str = CSV_PADRAO) -> Dict[str, Any]:
+    diretorio_snapshot = os.path.join(tempfile.mkdtemp(), "snapshot")
+    sem_snapshot = medir(caminho_csv, "")
+    medir(caminho_csv, diretorio_snapshot)  # grava o snapshot
+    com_snapshot = medir(caminho_csv, diretorio_snapshot)
+    return {"sem_snapshot": sem_snapshot, "com_snapshot": com_snapshot}
+
+
+if __name__ == "__main__":
+    if "--processo-filho" in sys.argv:
+        print(json.dumps(_medir_neste_processo()))
+        sys.exit(0)
+    caminho = sys.argv[1] if len(sys.argv) > 1 else CSV_PADRAO
+    print(json.dumps(medir_com_e_sem_snapshot(caminho), indent=2))
@@ -0,0 +1,69 @@
+"""
+Compara a memória ocupada pelo DataStore colunar e pelo formato antigo (lista de dicts).
+
+Uso:
+    python -m benchmarks.bench_memoria [1000 100000 1000000]
+
+O formato antigo é medido a partir do adaptador get_dados_regiao_dicts, que reaproveita
+as strings dos dicionários de categorias; o carregador antigo criava uma string por
+linha, então o número reportado para os dicts é um limite inferior.
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any
+
+from benchmarks.dados_sinteticos import gerar_csv
+from data_store import DataStore
+
+TAMANHOS_PADRAO = [1_000, 100_000, 1_000_000]
+
+
+def _mb(num_bytes: int) -> float:
+    return num_bytes / (1024 * 1024)
+
+
+def medir(num_linhas: int) -> Dict[str, Any]:
+    """Mede a memória dos dois formatos para um CSV sintético com num_linhas vendas."""
+    caminho = gerar_csv(num_linhas)
+
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    store = DataStore(caminho, diretorio_snapshot=None)
+    tempo_carga = time.perf_counter() - inicio
+    memoria_colunar, pico_carga = tracemalloc.get_traced_memory()
+    bytes_arrays = sum(
+        coluna.nbytes for colunas in store.colunas_por_regiao.values() for coluna in colunas.values()
+    )
+
+    tracemalloc.reset_peak()
+    antes = tracemalloc.get_traced_memory()[0]
+    dicts = {regiao: store.get_dados_regiao_dicts(regiao) for regiao in store.get_regioes()}
+    memoria_dicts = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    num_vendas = sum(len(linhas) for linhas in dicts.values())
+    del dicts, store
+    os.remove(caminho)
+
+    return {
+        "linhas": num_vendas,
+        "tempo_carga_s": tempo_carga,
+        "colunar_mb": _mb(memoria_colunar),
+        "colunar_arrays_mb": _mb(bytes_arrays),
+        "colunar_pico_carga_mb": _mb(pico_carga),
+        "dicts_mb": _mb(memoria_dicts),
+        "razao": memoria_dicts / memoria_colunar if memoria_colunar else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO
+    print(f"{'linhas':>10} {'carga (s)':>10} {'colunar (MB)':>13} {'arrays (MB)':>12} {'pico (MB)':>10} {'dicts (MB)':>11} {'razão':>7}")
+    for tamanho in tamanhos:
+        r = medir(tamanho)
+        print(f"{r['linhas']:>10} {r['tempo_carga_s']:>10.2f} {r['colunar_mb']:>13.1f} {r['colunar_arrays_mb']:>12.1f} "
+              f"{r['colunar_pico_carga_mb']:>10.1f} {r['dicts_mb']:>11.1f} {r['razao']:>6.1f}x")
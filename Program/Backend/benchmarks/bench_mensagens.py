@@ -0,0 +1,59 @@
+"""
+Compara a vazão (mensagens/s) da gravação de mensagens do chat com e sem escrita adiada.
+
+Uso:
+    python -m benchmarks.bench_mensagens [5000] [8]
+
+Várias threads (como o pool de threads do FastAPI) salvam mensagens em alguns chats,
+primeiro pelo caminho direto (uma transação por mensagem) e depois com a fila de escrita
+adiada, contando até a última mensagem estar gravada. Usa um SQLite temporário.
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+from sqlmodel import func, select
+
+import banco
+from benchmarks.ambiente import preparar_banco_sqlite
+from models import Message
+from services import ChatService
+
+NUM_CHATS = 20
+
+
+def _medir(chat_service: ChatService, num_mensagens: int, threads: int) -> float:
+    with banco.nova_sessao() as session:
+        chats = [chat_service.criar_chat(session) for _ in range(NUM_CHATS)]
+
+    def salvar(i: int) -> None:
+        with banco.nova_sessao() as session:
+            chat_service.salvar_mensagem(session, chats[i % NUM_CHATS], f"mensagem {i}", "user")
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(salvar, range(num_mensagens)))
+    if chat_service.escrita is not None:
+        chat_service.escrita.parar()
+    segundos = time.perf_counter() - inicio
+
+    with banco.nova_sessao() as session:
+        gravadas = session.exec(select(func.count(Message.id)).where(Message.chat_id.in_(chats))).one()
+    assert gravadas == num_mensagens, f"{gravadas} de {num_mensagens} mensagens gravadas"
+    return num_mensagens / segundos
+
+
+def medir(num_mensagens: int = 5000, threads: int = 8) -> Dict[str, Any]:
+    banco.engine = preparar_banco_sqlite()
+    direto = _medir(ChatService(escrita_adiada=False), num_mensagens, threads)
+    adiada = _medir(ChatService(escrita_adiada=True), num_mensagens, threads)
+    return {"direto_msg_por_s": direto, "adiada_msg_por_s": adiada, "ganho": adiada / direto}
+
+
+if __name__ == "__main__":
+    num_mensagens = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    r = medir(num_mensagens, threads)
+    print(f"Gravação direta:       {r['direto_msg_por_s']:.0f} mensagens/s")
+    print(f"Escrita adiada (lote): {r['adiada_msg_por_s']:.0f} mensagens/s ({r['ganho']:.1f}x)")
@@ -0,0 +1,77 @@
+"""
+Compara o tempo até o primeiro token de /api/query e /api/query/stream.
+
+Sobe um Ollama falso que gera os tokens ao longo de `atraso_llm_s` segundos e a aplicação
+real (banco SQLite temporário). Na rota sem streaming o primeiro token só chega com a
+resposta inteira; no streaming ele chega assim que o Ollama o gera.
+
+Uso:
+    python -m benchmarks.bench_streaming [repeticoes] [atraso_llm_s]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.ambiente import ServidorEmThread, percentil, preparar_banco_sqlite
+
+PORTA_OLLAMA = 11436
+PORTA_APP = 8766
+PERGUNTA = {"message": "Qual região teve mais lucro?"}
+
+
+async def _executar(url_app: str, repeticoes: int) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    tempos: Dict[str, List[float]] = {"query_total": [], "stream_primeiro_token": [], "stream_total": []}
+    async with httpx.AsyncClient(timeout=600) as cliente:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resposta = await cliente.post(f"{url_app}/api/query", json=PERGUNTA)
+            resposta.raise_for_status()
+            tempos["query_total"].append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            primeiro = None
+            async with cliente.stream("POST", f"{url_app}/api/query/stream", json=PERGUNTA) as resposta:
+                async for linha in resposta.aiter_lines():
+                    if linha and primeiro is None and "token" in json.loads(linha):
+                        primeiro = time.perf_counter() - inicio
+            tempos["stream_primeiro_token"].append(primeiro or 0.0)
+            tempos["stream_total"].append(time.perf_counter() - inicio)
+
+    return {
+        nome: {"p50_ms": percentil(valores, 50) * 1000, "p99_ms": percentil(valores, 99) * 1000}
+        for nome, valores in tempos.items()
+    }
+
+
+def main(repeticoes: int = 10, atraso_llm: float = 2.0):
+    os.environ["OLLAMA_API_URL"] = f"http://127.0.0.1:{PORTA_OLLAMA}"
+    # Perguntas repetidas: sem o cache de respostas, toda consulta chega ao LLM
+    os.environ["CACHE_RESPOSTAS_MAX_ITENS"] = "0"
+    os.environ.setdefault("INDICE_VETORIAL_DIR", os.path.join(tempfile.mkdtemp(), "indice"))
+
+    import banco
+    from app import create_app
+    from benchmarks.ollama_falso import criar_app_ollama
+
+    banco.engine = preparar_banco_sqlite()
+
+    with ServidorEmThread(criar_app_ollama(atraso_llm), PORTA_OLLAMA), \
+            ServidorEmThread(create_app(), PORTA_APP) as app:
+        resultado = asyncio.run(_executar(app.url, repeticoes))
+
+    print(f"{'medida':<24} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for nome, r in resultado.items():
+        print(f"{nome:<24} {r['p50_ms']:>10.1f} {r['p99_ms']:>10.1f}")
+    return resultado
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    atraso = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    main(repeticoes, atraso)
@@ -0,0 +1,92 @@
+"""
+Gera arquivos CSV sintéticos no mesmo formato de dadosdosprodutos.csv.
+
+Uso:
+    python -m benchmarks.dados_sinteticos 100000 /tmp/vendas_100k.csv
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+CABECALHO = "Latitude;Longitude;Data;CPF;CNPJ;nome_cliente;regiao;estado;produto;quantidade;estoque_atual;valor_unitario;lucro_total"
+
+ESTADOS_POR_REGIAO = {
+    "Norte": ["Acre", "Amapa", "Amazonas", "Para", "Rondonia", "Roraima", "Tocantins"],
+    "Nordeste": ["Alagoas", "Bahia", "Ceara", "Maranhao", "Paraiba", "Pernambuco", "Piaui", "Rio Grande do Norte", "Sergipe"],
+    "Centro-Oeste": ["Distrito Federal", "Goias", "Mato Grosso", "Mato Grosso do Sul"],
+    "Sudeste": ["Espirito Santo", "Minas Gerais", "Rio de Janeiro", "Sao Paulo"],
+    "Sul": ["Parana", "Rio Grande do Sul", "Santa Catarina"],
+}
+
+PRODUTOS = {
+    "Impressora HP": 480.0,
+    "Notebook Dell Inspiron": 3100.0,
+    "Smart TV LG": 2400.0,
+    "Smartphone Samsung Galaxy": 1800.0,
+    "Tablet Apple iPad": 4200.0,
+}
+
+NOMES = ["Agatha", "Alana", "Alice", "Bruno", "Caio", "Davi", "Helena", "Laura", "Miguel", "Theo"]
+SOBRENOMES = ["Cavalcante", "Sousa", "Vasconcelos", "da Rocha", "Albuquerque", "Caldeira", "Sa", "Vargas"]
+EMPRESAS = ["Varejo Digital LTDA", "Comercio Internacional SA", "Inovacao Digital SA", "Tech Brasil ME"]
+
+_DATA_INICIAL = date(2024, 1, 1)
+
+
+def _decimal_br(valor: float, casas: int) -> str:
+    return f"{valor:.{casas}f}".replace('.', ',')
+
+
+def gerar_linhas(num_linhas: int, semente: int = 42):
+    """Gera as linhas (sem cabeçalho) de um CSV sintético, de forma reprodutível."""
+    aleatorio = random.Random(semente)
+    regioes = list(ESTADOS_POR_REGIAO)
+    produtos = list(PRODUTOS)
+    for _ in range(num_linhas):
+        regiao = aleatorio.choice(regioes)
+        estado = aleatorio.choice(ESTADOS_POR_REGIAO[regiao])
+        produto = aleatorio.choice(produtos)
+        quantidade = aleatorio.randint(1, 10)
+        valor_unitario = PRODUTOS[produto] * aleatorio.uniform(0.9, 1.1)
+        lucro = quantidade * valor_unitario * aleatorio.uniform(0.2, 0.5)
+        data = _DATA_INICIAL + timedelta(days=aleatorio.randint(0, 730))
+        if aleatorio.random() < 0.5:
+            cliente = f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}"
+            cpf, cnpj = f"{aleatorio.randint(0, 10**11 - 1):011d}", ""
+        else:
+            cliente = aleatorio.choice(EMPRESAS)
+            cpf, cnpj = "", f"{aleatorio.randint(0, 10**14 - 1):014d}"
+        yield ";".join([
+            _decimal_br(aleatorio.uniform(-33.0, 5.0), 6),
+            _decimal_br(aleatorio.uniform(-73.0, -35.0), 6),
+            data.strftime("%d/%m/%Y"),
+            cpf,
+            cnpj,
+            cliente,
+            regiao,
+            estado,
+            produto,
+            str(quantidade),
+            str(aleatorio.randint(0, 200)),
+            _decimal_br(valor_unitario, 2),
+            _decimal_br(lucro, 2),
+        ])
+
+
+def gerar_csv(num_linhas: int, caminho: str = None, semente: int = 42) -> str:
+    """Escreve um CSV sintético com num_linhas vendas e retorna o caminho do arquivo."""
+    if caminho is None:
+        caminho = os.path.join(tempfile.gettempdir(), f"vendas_sinteticas_{num_linhas}.csv")
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(CABECALHO + "\n")
+        for linha in gerar_linhas(num_linhas, semente):
+            arquivo.write(linha + "\n")
+    return caminho
+
+
+if __name__ == "__main__":
+    num_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    caminho = sys.argv[2] if len(sys.argv) > 2 else None
+    print(gerar_csv(num_linhas, caminho))
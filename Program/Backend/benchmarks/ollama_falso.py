@@ -0,0 +1,42 @@
+"""
+Servidor Ollama falso para benchmarks: responde /api/generate depois de um atraso fixo.
+
+Com "stream": true, a resposta é enviada em NDJSON, com os tokens distribuídos ao longo
+do mesmo atraso (como o Ollama faz durante a geração).
+
+Uso isolado:
+    python -m benchmarks.ollama_falso 11435 2.0
+"""
+import asyncio
+import json
+import sys
+
+import uvicorn
+from fastapi import FastAPI, Body
+from fastapi.responses import StreamingResponse
+
+
+def criar_app_ollama(atraso: float, num_tokens: int = 20) -> FastAPI:
+    app = FastAPI()
+
+    async def tokens(modelo):
+        for i in range(num_tokens):
+            await asyncio.sleep(atraso / num_tokens)
+            yield json.dumps({"model": modelo, "response": f"tok{i} ", "done": False}) + "\n"
+        yield json.dumps({"model": modelo, "response": "", "done": True}) + "\n"
+
+    @app.post("/api/generate")
+    async def generate(payload: dict = Body(...)):
+        if payload.get("stream"):
+            return StreamingResponse(tokens(payload.get("model")), media_type="application/x-ndjson")
+        await asyncio.sleep(atraso)
+        resposta = "".join(f"tok{i} " for i in range(num_tokens))
+        return {"model": payload.get("model"), "response": resposta, "done": True}
+
+    return app
+
+
+if __name__ == "__main__":
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 11435
+    atraso = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    uvicorn.run(criar_app_ollama(atraso), host="127.0.0.1", port=porta)
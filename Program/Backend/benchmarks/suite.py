@@ -0,0 +1,282 @@
+"""
+Suíte de benchmarks dos caminhos críticos de vendas e do chat, com resultado em JSON.
+
+Uso:
+    python -m benchmarks.suite [--tamanhos 1000 100000 1000000] [--saida resultado.json]
+                               [--repeticoes 50] [--comparar resultado_anterior.json]
+
+Para cada tamanho gera um CSV sintético no formato de dadosdosprodutos.csv e mede:
+carga e memória do DataStore (do CSV e do snapshot binário), latência de
+VendasService.obter_dados_vendas_regiao, vazão da importação (importar_csv_em_massa),
+latência de LlamaService.buscar_dados_relevantes e das rotas de chat (CRUD e /api/query
+com um Ollama falso, sem atraso de geração), além do tempo de inicialização da aplicação
+num processo novo (benchmarks.bench_inicializacao).
+
+Usa um SQLite temporário; defina BENCH_DATABASE_URL com uma URL PostgreSQL para medir no
+PostgreSQL (as tabelas Vendas, Chat e Message desse banco são recriadas a cada tamanho).
+O JSON traz o commit e o ambiente; --comparar mostra a variação de cada medida em relação
+a um resultado anterior, para acompanhar regressões entre commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Callable
+
+from benchmarks.ambiente import ServidorEmThread, resumo_latencias
+from benchmarks.bench_inicializacao import medir as medir_inicializacao
+from benchmarks.dados_sinteticos import gerar_csv
+
+TAMANHOS_PADRAO = [1_000, 100_000, 1_000_000]
+PORTA_OLLAMA = 11440
+PERGUNTAS = [
+    "Qual região teve mais lucro?",
+    "Quais clientes compraram Notebook Dell Inspiron em Sao Paulo?",
+    "Vendas de Smart TV LG no Nordeste",
+    "Qual o produto mais vendido no Sul?",
+    "Lucro das vendas de Tablet Apple iPad na Bahia",
+]
+
+
+def _cronometrar(funcao: Callable[[], Any], repeticoes: int) -> List[float]:
+    latencias = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def _novo_banco(diretorio: str):
+    from sqlmodel import SQLModel
+    from banco import criar_engine
+    import models  # noqa: F401 (registra Vendas, Chat e Message no metadata)
+
+    url = os.environ.get("BENCH_DATABASE_URL") or f"sqlite:///{diretorio}/vendas.db"
+    engine = criar_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _medir_data_store(caminho: str, repeticoes: int) -> Dict[str, Any]:
+    import services
+    from data_store import DataStore
+    from progresso_ingestao import memoria_pico_mb
+
+    # Primeira carga: lê o CSV e grava o snapshot; a segunda abre o snapshot (memory-map)
+    diretorio_snapshot = os.path.join(os.path.dirname(caminho), "snapshot")
+    inicio = time.perf_counter()
+    store = DataStore(caminho, diretorio_snapshot)
+    carga = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    DataStore(caminho, diretorio_snapshot)
+    carga_snapshot = time.perf_counter() - inicio
+    linhas = sum(len(store.get_dados_regiao(regiao)) for regiao in store.get_regioes())
+    bytes_colunas = sum(
+        coluna.nbytes for colunas in store.colunas_por_regiao.values() for coluna in colunas.values()
+    )
+
+    regioes = store.get_regioes()
+    servico = services.VendasService(store)
+    proxima = iter(range(sys.maxsize))
+
+    def consultar(limite):
+        servico.obter_dados_vendas_regiao(regioes[next(proxima) % len(regioes)], limite=limite)
+
+    pagina = _cronometrar(lambda: consultar(100), repeticoes)
+    completa = _cronometrar(lambda: consultar(None), max(len(regioes), repeticoes // 10))
+    return {
+        "data_store": {
+            "linhas": linhas,
+            "carga_s": carga,
+            "linhas_por_s": linhas / carga if carga else 0.0,
+            "carga_snapshot_s": carga_snapshot,
+            "colunas_mb": bytes_colunas / (1024 * 1024),
+            "rss_pico_mb": memoria_pico_mb(),
+        },
+        "vendas_regiao": {
+            "pagina_100": resumo_latencias(pagina),
+            "regiao_completa": resumo_latencias(completa),
+        },
+    }
+
+
+def _medir_importacao(caminho: str, engine, diretorio: str) -> Dict[str, Any]:
+    from importar_csv import importar_csv_em_massa
+
+    estatisticas = importar_csv_em_massa(
+        caminho, engine, os.path.join(diretorio, "rejeitados.csv"), atualizar_indice=False
+    )
+    return {
+        "linhas": estatisticas["linhas_importadas"],
+        "rejeitadas": estatisticas["linhas_rejeitadas"],
+        "segundos": estatisticas["segundos"],
+        "linhas_por_s": estatisticas["linhas_por_segundo"],
+    }
+
+
+def _medir_busca(diretorio: str, repeticoes: int) -> Dict[str, Any]:
+    from indice_vetorial import IndiceVetorial
+    from services import llama_service
+
+    # Índice novo a cada tamanho: a primeira busca ajusta o vetorizador e indexa tudo
+    llama_service.indice = IndiceVetorial(os.path.join(diretorio, "indice"))
+    inicio = time.perf_counter()
+    llama_service.buscar_dados_relevantes(PERGUNTAS[0])
+    construcao = time.perf_counter() - inicio
+
+    proxima = iter(range(sys.maxsize))
+    latencias = _cronometrar(
+        lambda: llama_service.buscar_dados_relevantes(PERGUNTAS[next(proxima) % len(PERGUNTAS)]), repeticoes
+    )
+    return {"construcao_indice_s": construcao, **resumo_latencias(latencias)}
+
+
+def _medir_chat(cliente, repeticoes: int) -> Dict[str, Any]:
+    def verificar(resposta):
+        resposta.raise_for_status()
+        return resposta.json()
+
+    chats: List[int] = []
+    criar = _cronometrar(lambda: chats.append(verificar(cliente.post("/api/chats"))["chat_id"]), repeticoes)
+    proxima = iter(range(sys.maxsize))
+    mensagem = _cronometrar(
+        lambda: verificar(cliente.post(
+            f"/api/chats/{chats[next(proxima) % len(chats)]}/messages",
+            json={"content": PERGUNTAS[0], "sender": "user"}
+        )),
+        repeticoes * 4
+    )
+    listar = _cronometrar(lambda: verificar(cliente.get("/api/chats", params={"limite": 50})), repeticoes)
+    mensagens = _cronometrar(
+        lambda: verificar(cliente.get(f"/api/chats/{chats[0]}/messages", params={"limit": 100})), repeticoes
+    )
+    consulta = _cronometrar(
+        lambda: verificar(cliente.post("/api/query", json={"message": PERGUNTAS[next(proxima) % len(PERGUNTAS)]})),
+        max(5, repeticoes // 5)
+    )
+    excluir = _cronometrar(lambda: verificar(cliente.delete(f"/api/chats/{chats.pop()}")), repeticoes)
+    return {
+        "criar_chat": resumo_latencias(criar),
+        "salvar_mensagem": resumo_latencias(mensagem),
+        "listar_chats": resumo_latencias(listar),
+        "listar_mensagens": resumo_latencias(mensagens),
+        "consulta_llm": resumo_latencias(consulta),
+        "excluir_chat": resumo_latencias(excluir),
+    }
+
+
+def medir(num_linhas: int, cliente, repeticoes: int) -> Dict[str, Any]:
+    """Executa todas as medidas para um CSV sintético com num_linhas vendas."""
+    import banco
+
+    diretorio = tempfile.mkdtemp()
+    caminho = gerar_csv(num_linhas, os.path.join(diretorio, "vendas.csv"))
+    try:
+        resultado = {"linhas": num_linhas, **_medir_data_store(caminho, repeticoes)}
+        # Processo novo até /api/sistema/prontidao responder 200 (o snapshot já foi gravado acima)
+        resultado["inicializacao"] = {
+            "sem_snapshot": medir_inicializacao(caminho, ""),
+            "com_snapshot": medir_inicializacao(caminho, os.path.join(diretorio, "snapshot")),
+        }
+        banco.engine.dispose()
+        banco.engine = _novo_banco(diretorio)
+        resultado["importacao"] = _medir_importacao(caminho, banco.engine, diretorio)
+        resultado["busca_relevantes"] = _medir_busca(diretorio, repeticoes)
+        resultado["chat"] = _medir_chat(cliente, repeticoes)
+    finally:
+        os.remove(caminho)
+    return resultado
+
+
+def _metadados() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    url = os.environ.get("BENCH_DATABASE_URL")
+    return {
+        "commit": commit,
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "banco": url.split(":", 1)[0] if url else "sqlite",
+    }
+
+
+def _medidas(prefixo: str, valor, saida: Dict[str, float]) -> None:
+    """Achata o resultado em {caminho: valor} só com as medidas de tempo e vazão."""
+    if isinstance(valor, dict):
+        for chave, filho in valor.items():
+            _medidas(f"{prefixo}.{chave}" if prefixo else chave, filho, saida)
+    elif isinstance(valor, (int, float)) and prefixo.endswith(("_ms", "_s", "_por_s", "segundos", "_mb")):
+        saida[prefixo] = float(valor)
+
+
+def comparar(atual: Dict[str, Any], anterior: Dict[str, Any]) -> List[str]:
+    """Variação de cada medida em relação a um resultado anterior, para os tamanhos em comum."""
+    linhas = []
+    anteriores = {r["linhas"]: r for r in anterior["resultados"]}
+    for resultado in atual["resultados"]:
+        base = anteriores.get(resultado["linhas"])
+        if base is None:
+            continue
+        novas: Dict[str, float] = {}
+        antigas: Dict[str, float] = {}
+        _medidas("", resultado, novas)
+        _medidas("", base, antigas)
+        for nome, valor in novas.items():
+            if antigas.get(nome):
+                variacao = (valor - antigas[nome]) / antigas[nome]
+                linhas.append(f"{resultado['linhas']:>8} {nome:<45} {antigas[nome]:>12.2f} {valor:>12.2f} {variacao:>+8.0%}")
+    return linhas
+
+
+def main(tamanhos: List[int], repeticoes: int = 50) -> Dict[str, Any]:
+    os.environ["OLLAMA_API_URL"] = f"http://127.0.0.1:{PORTA_OLLAMA}"
+    # Perguntas repetidas: sem o cache de respostas, toda consulta passa pelo pipeline completo
+    os.environ["CACHE_RESPOSTAS_MAX_ITENS"] = "0"
+    os.environ.setdefault("INDICE_VETORIAL_DIR", os.path.join(tempfile.mkdtemp(), "indice"))
+    # Progresso dos lotes no log só atrapalharia a leitura; defina LOG_NIVEL=INFO para vê-lo
+    os.environ.setdefault("LOG_NIVEL", "WARNING")
+
+    from fastapi.testclient import TestClient
+    from app import create_app
+    from benchmarks.ollama_falso import criar_app_ollama
+
+    resultados = []
+    with ServidorEmThread(criar_app_ollama(0.0, 5), PORTA_OLLAMA), TestClient(create_app()) as cliente:
+        for tamanho in tamanhos:
+            resultados.append(medir(tamanho, cliente, repeticoes))
+    return {"metadados": _metadados(), "resultados": resultados}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de vendas e chat com saída em JSON")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: imprime na saída padrão)")
+    parser.add_argument("--comparar", help="resultado JSON anterior para comparar")
+    argumentos = parser.parse_args()
+
+    resultado = main(argumentos.tamanhos, argumentos.repeticoes)
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        print(f"{'linhas':>8} {'medida':<45} {'anterior':>12} {'atual':>12} {'variação':>8}", file=sys.stderr)
+        for linha in comparar(resultado, anterior):
+            print(linha, file=sys.stderr)
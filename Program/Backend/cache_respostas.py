@@ -0,0 +1,145 @@
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple, Any
+
+# Palavras ignoradas ao comparar perguntas parecidas (sem acentos, como na pergunta normalizada)
+PALAVRAS_VAZIAS = frozenset("""
+    a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela pelos pelas
+    para pra com ao aos e ou que qual quais quem como onde quando foi sao me meu minha se
+""".split())
+
+
+def normalizar_pergunta(texto: str) -> str:
+    """Normaliza a pergunta para a chave do cache: sem acentos, minúscula, espaços simples e sem pontuação final."""
+    sem_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', sem_acentos.lower()).strip().rstrip('?!. ')
+
+
+# Palavras que invertem ou mudam o sentido da pergunta: "mais"/"menos vendido", "não vendeu".
+# Duas perguntas só são parecidas se tiverem exatamente as mesmas
+PALAVRAS_POLARIDADE = frozenset("""
+    mais menos maior maiores menor menores melhor melhores pior piores maximo minimo
+    acima abaixo primeiro primeiros ultimo ultimos crescente decrescente nao nunca sem nenhum nenhuma
+""".split())
+
+
+def palavras_relevantes(pergunta_normalizada: str) -> FrozenSet[str]:
+    """Palavras da pergunta normalizada, sem pontuação e sem as PALAVRAS_VAZIAS."""
+    return frozenset(re.findall(r'\w+', pergunta_normalizada)) - PALAVRAS_VAZIAS
+
+
+def similaridade_palavras(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Similaridade de Jaccard entre dois conjuntos de palavras (1 se iguais)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def polaridade(palavras: FrozenSet[str]) -> FrozenSet[str]:
+    """Palavras de polaridade e números (anos, "top 5"): precisam ser iguais em perguntas parecidas."""
+    return frozenset(palavra for palavra in palavras if palavra in PALAVRAS_POLARIDADE or palavra.isdigit())
+
+
+class EntradaCache:
+    def __init__(self, resposta: str, pergunta: str, criado_em: float):
+        self.resposta = resposta
+        self.palavras = palavras_relevantes(pergunta)
+        self.polaridade = polaridade(self.palavras)
+        self.criado_em = criado_em
+
+
+class CacheRespostas:
+    """
+    Cache de respostas do chat com expulsão LRU e TTL.
+
+    A chave é a pergunta normalizada mais a versão do contexto recuperado (os IDs das
+    vendas usadas no prompt). Se nenhuma chave exata existir (e `limiar_similaridade` não
+    for None), procura uma pergunta anterior parecida. Ela precisa ter a mesma versão do
+    contexto, ou seja, as mesmas vendas recuperadas e, portanto, as mesmas regiões, produtos
+    e clientes. Precisa ter também as mesmas palavras de polaridade e os mesmos números. E
+    a similaridade de Jaccard entre as palavras das duas, fora as PALAVRAS_VAZIAS, precisa
+    ser >= `limiar_similaridade`. O cosseno do TF-IDF das vendas não serve para isso: o
+    vocabulário dele não tem "mais", "menos" nem "lucro", então perguntas opostas empatam.
+    Todo o cache é descartado quando a versão dos dados (tabela Vendas) muda.
+    Usado apenas a partir do event loop, por isso não tem trava.
+    """
+
+    def __init__(self, max_itens: int = 256, ttl: float = 3600.0, limiar_similaridade: Optional[float] = None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.limiar_similaridade = limiar_similaridade
+        self._itens: "OrderedDict[Tuple[str, str], EntradaCache]" = OrderedDict()
+        self.versao_dados: Optional[int] = None
+        self.acertos = 0
+        self.acertos_similares = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    def invalidar_se_mudou(self, versao_dados: int) -> None:
+        """Descarta todas as respostas se os dados de vendas mudaram desde que foram geradas."""
+        if versao_dados != self.versao_dados:
+            if self._itens:
+                self.invalidacoes += 1
+            self._itens.clear()
+            self.versao_dados = versao_dados
+
+    def _expirado(self, entrada: EntradaCache, agora: float) -> bool:
+        return agora - entrada.criado_em > self.ttl
+
+    def _buscar_similar(self, chave: Tuple[str, str], agora: float) -> Optional[Tuple[str, str]]:
+        pergunta, versao_contexto = chave
+        palavras = palavras_relevantes(pergunta)
+        guarda = polaridade(palavras)
+        melhor, melhor_similaridade = None, self.limiar_similaridade
+        for chave_item, entrada in self._itens.items():
+            # Respostas de outro contexto (dados recarregados) ou com outro sentido não servem
+            if chave_item[1] != versao_contexto or entrada.polaridade != guarda or self._expirado(entrada, agora):
+                continue
+            similaridade = similaridade_palavras(entrada.palavras, palavras)
+            if similaridade >= melhor_similaridade:
+                melhor, melhor_similaridade = chave_item, similaridade
+        return melhor
+
+    def obter(self, pergunta: str, versao_contexto: str) -> Optional[str]:
+        """Retorna a resposta em cache (ou None), atualizando os contadores."""
+        agora = time.monotonic()
+        chave = (normalizar_pergunta(pergunta), versao_contexto)
+        entrada = self._itens.get(chave)
+        if entrada is not None and self._expirado(entrada, agora):
+            del self._itens[chave]
+            entrada = None
+        if entrada is not None:
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return entrada.resposta
+
+        if self.limiar_similaridade is not None:
+            chave_similar = self._buscar_similar(chave, agora)
+            if chave_similar is not None:
+                self._itens.move_to_end(chave_similar)
+                self.acertos_similares += 1
+                return self._itens[chave_similar].resposta
+
+        self.falhas += 1
+        return None
+
+    def guardar(self, pergunta: str, versao_contexto: str, resposta: str) -> None:
+        """Guarda uma resposta, expulsando a menos usada recentemente se o cache estiver cheio."""
+        chave = (normalizar_pergunta(pergunta), versao_contexto)
+        self._itens[chave] = EntradaCache(resposta, chave[0], time.monotonic())
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        consultas = self.acertos + self.acertos_similares + self.falhas
+        return {
+            "itens": len(self._itens),
+            "acertos": self.acertos,
+            "acertos_similares": self.acertos_similares,
+            "falhas": self.falhas,
+            "invalidacoes": self.invalidacoes,
+            "taxa_acerto": (self.acertos + self.acertos_similares) / consultas if consultas else 0.0,
+        }
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from typing import Optional, AsyncIterator
+
+import httpx
+from fastapi import HTTPException
+
+from config import (
+    OLLAMA_API_URL, OLLAMA_MODELO, OLLAMA_TIMEOUT_CONEXAO, OLLAMA_TIMEOUT_LEITURA,
+    OLLAMA_TIMEOUT_FILA, OLLAMA_MAX_CONEXOES, OLLAMA_MAX_GERACOES
+)
+
+
+class ClienteOllama:
+    """
+    Cliente assíncrono para o Ollama.
+
+    Usa um único httpx.AsyncClient (pool de conexões keep-alive) e um semáforo que limita
+    quantas gerações ficam em andamento ao mesmo tempo; as demais aguardam na fila até
+    `timeout_fila` segundos. Nada aqui bloqueia o event loop.
+    """
+
+    def __init__(
+        self,
+        url_base: str = OLLAMA_API_URL,
+        modelo: str = OLLAMA_MODELO,
+        timeout_conexao: float = OLLAMA_TIMEOUT_CONEXAO,
+        timeout_leitura: float = OLLAMA_TIMEOUT_LEITURA,
+        timeout_fila: float = OLLAMA_TIMEOUT_FILA,
+        max_conexoes: int = OLLAMA_MAX_CONEXOES,
+        max_geracoes: int = OLLAMA_MAX_GERACOES,
+    ):
+        self.url_generate = f"{url_base.rstrip('/')}/api/generate"
+        self.modelo = modelo
+        self.timeout = httpx.Timeout(
+            connect=timeout_conexao, read=timeout_leitura, write=timeout_conexao, pool=timeout_fila
+        )
+        self.limites = httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_conexoes)
+        self.timeout_fila = timeout_fila
+        self.max_geracoes = max_geracoes
+        self._cliente: Optional[httpx.AsyncClient] = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self.em_andamento = 0
+
+    @property
+    def cliente(self) -> httpx.AsyncClient:
+        # Criado sob demanda, já dentro do event loop do servidor
+        if self._cliente is None or self._cliente.is_closed:
+            self._cliente = httpx.AsyncClient(timeout=self.timeout, limits=self.limites)
+        return self._cliente
+
+    @property
+    def semaforo(self) -> asyncio.Semaphore:
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_geracoes)
+        return self._semaforo
+
+    async def _aguardar_vaga(self) -> None:
+        try:
+            await asyncio.wait_for(self.semaforo.acquire(), timeout=self.timeout_fila)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Muitas consultas ao Llama em andamento, tente novamente")
+
+    async def gerar(self, prompt: str) -> str:
+        """Envia o prompt ao Ollama e retorna a resposta completa."""
+        payload = {
+            "model": self.modelo,
+            "prompt": prompt,
+            "stream": False
+        }
+        await self._aguardar_vaga()
+        self.em_andamento += 1
+        try:
+            response = await self.cliente.post(self.url_generate, json=payload)
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Tempo esgotado ao chamar o Llama")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Erro de conexão com o Llama: {str(e)}")
+        finally:
+            self.em_andamento -= 1
+            self.semaforo.release()
+
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro ao chamar o Llama: {response.status_code}, {response.text}"
+            )
+        return response.json()["response"]
+
+    async def gerar_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Envia o prompt com stream ativado e devolve os tokens à medida que o Ollama os gera."""
+        payload = {
+            "model": self.modelo,
+            "prompt": prompt,
+            "stream": True
+        }
+        await self._aguardar_vaga()
+        self.em_andamento += 1
+        try:
+            async with self.cliente.stream("POST", self.url_generate, json=payload) as response:
+                if response.status_code != 200:
+                    corpo = (await response.aread()).decode("utf-8", "replace")
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Erro ao chamar o Llama: {response.status_code}, {corpo}"
+                    )
+                # O Ollama envia um objeto JSON por linha
+                async for linha in response.aiter_lines():
+                    if not linha:
+                        continue
+                    dados = json.loads(linha)
+                    if dados.get("response"):
+                        yield dados["response"]
+                    if dados.get("done"):
+                        break
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Tempo esgotado ao chamar o Llama")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Erro de conexão com o Llama: {str(e)}")
+        finally:
+            self.em_andamento -= 1
+            self.semaforo.release()
+
+    async def fechar(self) -> None:
+        """Fecha as conexões do pool (chamado no desligamento da aplicação)."""
+        if self._cliente is not None:
+            await self._cliente.aclose()
+            self._cliente = None
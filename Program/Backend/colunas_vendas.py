@@ -0,0 +1,211 @@
+from array import array
+from typing import Dict, List, Any, Optional, Iterator, Sequence, Union
+from datetime import date
+
+import numpy as np
+
+# Ordinal de 1970-01-01, usado para guardar datas como dias desde a época (datetime64[D])
+_EPOCA_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Esquema das colunas: nome -> (typecode do array.array usado na carga, dtype NumPy final)
+ESQUEMA_COLUNAS = {
+    "id": ("q", np.int64),
+    "data": ("q", np.dtype("datetime64[D]")),
+    "latitude": ("d", np.float64),
+    "longitude": ("d", np.float64),
+    "doc_fiscal": ("i", np.int32),
+    "cliente": ("i", np.int32),
+    "regiao": ("i", np.int32),
+    "estado": ("i", np.int32),
+    "estado_nome": ("i", np.int32),
+    "produto": ("i", np.int32),
+    "quantidade": ("i", np.int32),
+    "estoque_atual": ("i", np.int32),
+    "valor_unitario": ("d", np.float64),
+    "valor": ("d", np.float64),
+    "lucro": ("d", np.float64),
+}
+
+# Colunas guardadas como códigos de dicionário (categóricas)
+COLUNAS_CATEGORICAS = ("doc_fiscal", "cliente", "regiao", "estado", "estado_nome", "produto")
+
+# Nome da coluna -> chave usada no formato antigo (lista de dicts)
+CHAVES_LEGADAS = {
+    "id": "ID",
+    "data": "Data",
+    "latitude": "Latitude",
+    "longitude": "Longitude",
+    "doc_fiscal": "CPF_CNPJ",
+    "cliente": "Cliente",
+    "regiao": "Regiao",
+    "estado": "Estado",
+    "estado_nome": "Estado_Nome",
+    "produto": "Produto",
+    "quantidade": "Quantidade",
+    "estoque_atual": "estoque_atual",
+    "valor_unitario": "Valor_Unitario",
+    "valor": "Valor",
+    "lucro": "Lucro",
+}
+
+# Chave do formato antigo -> nome da coluna
+COLUNAS_POR_CHAVE = {chave: nome for nome, chave in CHAVES_LEGADAS.items()}
+
+
+def colunas_vazias() -> Dict[str, np.ndarray]:
+    """Retorna um conjunto de colunas sem nenhuma linha."""
+    return {nome: np.empty(0, dtype=dtype) for nome, (_, dtype) in ESQUEMA_COLUNAS.items()}
+
+
+class Categorias:
+    """Dicionário de valores distintos de uma coluna categórica (valor <-> código)."""
+
+    def __init__(self):
+        self.valores: List[Optional[str]] = []
+        self._codigos: Dict[Optional[str], int] = {}
+
+    @classmethod
+    def de_valores(cls, valores: List[Optional[str]]) -> "Categorias":
+        """Recria o dicionário a partir da lista de valores (na ordem dos códigos)."""
+        categorias = cls()
+        for valor in valores:
+            categorias.codificar(valor)
+        return categorias
+
+    def copiar(self) -> "Categorias":
+        """Cópia independente (códigos novos registrados na cópia não aparecem no original)."""
+        categorias = Categorias()
+        categorias.valores = list(self.valores)
+        categorias._codigos = dict(self._codigos)
+        return categorias
+
+    def codificar(self, valor: Optional[str]) -> int:
+        """Retorna o código do valor, registrando-o se ainda não existir."""
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self._codigos[valor] = codigo
+            self.valores.append(valor)
+        return codigo
+
+    def codigo(self, valor: Optional[str]) -> Optional[int]:
+        """Retorna o código de um valor já registrado (ou None)."""
+        return self._codigos.get(valor)
+
+    def ranques(self) -> np.ndarray:
+        """Posição de cada código na ordem alfabética dos valores (para ordenação)."""
+        ordem = sorted(range(len(self.valores)), key=lambda i: (self.valores[i] is None, self.valores[i] or ""))
+        ranques = np.empty(len(self.valores), dtype=np.int64)
+        ranques[ordem] = np.arange(len(self.valores))
+        return ranques
+
+    def decodificar(self, codigos: np.ndarray) -> np.ndarray:
+        """Converte um array de códigos no array de valores correspondente."""
+        return np.array(self.valores, dtype=object)[codigos]
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+
+class ConstrutorColunas:
+    """Acumula linhas já convertidas em buffers array.array compactos, por região."""
+
+    def __init__(self, categorias: Dict[str, Categorias]):
+        self.categorias = categorias
+        self.buffers: Dict[str, Dict[str, array]] = {}
+        self._cache_datas: Dict[str, int] = {}
+
+    def _buffers_regiao(self, regiao: str) -> Dict[str, array]:
+        buffers = self.buffers.get(regiao)
+        if buffers is None:
+            buffers = {nome: array(typecode) for nome, (typecode, _) in ESQUEMA_COLUNAS.items()}
+            self.buffers[regiao] = buffers
+        return buffers
+
+    def converter_data(self, data_br: str) -> int:
+        """Converte 'dd/mm/aaaa' em dias desde 1970-01-01 (com cache, pois as datas se repetem)."""
+        dias = self._cache_datas.get(data_br)
+        if dias is None:
+            dia, mes, ano = data_br.split('/')
+            dias = date(int(ano), int(mes), int(dia)).toordinal() - _EPOCA_ORDINAL
+            self._cache_datas[data_br] = dias
+        return dias
+
+    def adicionar(self, regiao: str, valores: Dict[str, Any]) -> None:
+        """Adiciona uma linha (valores por nome de coluna) aos buffers da região."""
+        buffers = self._buffers_regiao(regiao)
+        for nome in COLUNAS_CATEGORICAS:
+            buffers[nome].append(self.categorias[nome].codificar(valores[nome]))
+        for nome in ESQUEMA_COLUNAS:
+            if nome not in COLUNAS_CATEGORICAS:
+                buffers[nome].append(valores[nome])
+
+    def construir(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Converte os buffers em arrays NumPy sem cópia (np.frombuffer)."""
+        resultado = {}
+        for regiao, buffers in self.buffers.items():
+            if not len(buffers["id"]):
+                resultado[regiao] = colunas_vazias()
+                continue
+            resultado[regiao] = {
+                nome: np.frombuffer(buffers[nome], dtype=dtype)
+                for nome, (_, dtype) in ESQUEMA_COLUNAS.items()
+            }
+        return resultado
+
+
+class VisaoRegiao(Sequence):
+    """
+    Fatia colunar das vendas de uma região.
+
+    As colunas são views dos arrays do DataStore (nenhuma cópia é feita).
+    Indexar ou iterar devolve dicts no formato antigo, para compatibilidade.
+    """
+
+    def __init__(self, colunas: Dict[str, np.ndarray], categorias: Dict[str, Categorias]):
+        self.colunas = colunas
+        self.categorias = categorias
+
+    def __len__(self) -> int:
+        return len(self.colunas["id"])
+
+    def coluna(self, nome: str) -> np.ndarray:
+        """Retorna a coluna bruta (códigos, no caso das categóricas)."""
+        return self.colunas[nome]
+
+    def valores(self, nome: str) -> np.ndarray:
+        """Retorna a coluna com as categóricas já decodificadas."""
+        if nome in COLUNAS_CATEGORICAS:
+            return self.categorias[nome].decodificar(self.colunas[nome])
+        return self.colunas[nome]
+
+    def filtrar(self, indices: Union[slice, np.ndarray]) -> "VisaoRegiao":
+        """Retorna uma nova visão com as linhas selecionadas (slice gera views)."""
+        return VisaoRegiao({nome: col[indices] for nome, col in self.colunas.items()}, self.categorias)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return self.filtrar(indice)
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fora do intervalo")
+        return self.filtrar(slice(indice, indice + 1)).para_dicts()[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.para_dicts())
+
+    def _valores_legados(self, nome: str) -> List[Any]:
+        if nome == "data":
+            return np.datetime_as_string(self.colunas[nome], unit="D").tolist()
+        if nome in ("latitude", "longitude"):
+            # Coordenada ausente (NaN) sai como None, como no modo banco
+            return [repr(v) if v == v else None for v in self.colunas[nome].tolist()]
+        return self.valores(nome).tolist()
+
+    def para_dicts(self, campos: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Adaptador para o formato antigo: uma lista de dicts, um por venda."""
+        nomes = campos or list(CHAVES_LEGADAS)
+        chaves = [CHAVES_LEGADAS[nome] for nome in nomes]
+        colunas = [self._valores_legados(nome) for nome in nomes]
+        return [dict(zip(chaves, linha)) for linha in zip(*colunas)]
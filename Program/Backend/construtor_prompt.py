@@ -0,0 +1,133 @@
+import math
+import time
+from typing import Dict, List, Any, Sequence
+
+# Colunas do bloco de dados enviado ao modelo (uma linha por venda, separadas por ';')
+CABECALHO_DADOS = "regiao;estado;cliente;produto;qtd;preco_unit;lucro;data"
+
+INSTRUCOES = """Você é um assistente especializado em análise de dados de vendas. Use os dados do banco de dados para responder à pergunta do usuário.
+
+IMPORTANTE: Responda SEMPRE em português brasileiro, usando linguagem clara e profissional."""
+
+FECHAMENTO = """Por favor, responda de forma clara e concisa, usando os dados disponíveis. Se não houver dados suficientes para responder completamente, indique isso na sua resposta. Lembre-se de usar termos e expressões comuns no português brasileiro."""
+
+
+def estimar_tokens(texto: str, caracteres_por_token: float = 4.0) -> int:
+    """Estimativa do número de tokens de um texto (sem depender do tokenizador do modelo)."""
+    return math.ceil(len(texto) / caracteres_por_token)
+
+
+def linha_venda(item) -> str:
+    """Uma venda em formato compacto, na ordem de CABECALHO_DADOS."""
+    return ";".join([
+        item.regiao or "",
+        item.estado or "",
+        item.nome_cliente or "",
+        item.produto or "",
+        str(item.quantidade if item.quantidade is not None else ""),
+        f"{item.valor_unitario:.2f}" if item.valor_unitario is not None else "",
+        f"{item.lucro_total:.2f}" if item.lucro_total is not None else "",
+        item.data or "",
+    ])
+
+
+class PromptMontado:
+    def __init__(self, texto: str, tokens: int, linhas_incluidas: int, linhas_omitidas: int, tempo_ms: float):
+        self.texto = texto
+        self.tokens = tokens
+        self.linhas_incluidas = linhas_incluidas
+        self.linhas_omitidas = linhas_omitidas
+        self.tempo_ms = tempo_ms
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            "tokens_prompt": self.tokens,
+            "linhas_incluidas": self.linhas_incluidas,
+            "linhas_omitidas": self.linhas_omitidas,
+            "tempo_prompt_ms": self.tempo_ms,
+        }
+
+
+class ConstrutorPrompt:
+    """
+    Monta o prompt do chat dentro de um orçamento de tokens.
+
+    As vendas recuperadas entram como um bloco CSV compacto, na ordem de relevância.
+    Quando o orçamento acaba, as vendas de menor relevância são trocadas por uma linha
+    de resumo (quantidade e lucro somados). Os totais pré-calculados (resumos), quando
+    informados, entram antes das vendas e são descontados do orçamento primeiro, limitados
+    a `fracao_resumos` do orçamento (as últimas linhas são cortadas), para sobrar espaço às vendas.
+    """
+
+    def __init__(self, orcamento_tokens: int = 1500, caracteres_por_token: float = 4.0, fracao_resumos: float = 0.5):
+        self.orcamento_tokens = orcamento_tokens
+        self.caracteres_por_token = caracteres_por_token
+        self.fracao_resumos = fracao_resumos
+
+    def _tokens(self, texto: str) -> int:
+        return estimar_tokens(texto, self.caracteres_por_token)
+
+    def _limitar_resumos(self, resumos: str) -> str:
+        """Linhas iniciais dos resumos que cabem em `fracao_resumos` do orçamento."""
+        limite = int(self.orcamento_tokens * self.fracao_resumos)
+        if self._tokens(resumos) <= limite:
+            return resumos
+        aviso = "(resumo truncado)"
+        limite -= self._tokens(aviso) + 1
+        linhas: List[str] = []
+        usados = 0
+        for linha in resumos.splitlines():
+            custo = self._tokens(linha) + 1
+            if usados + custo > limite:
+                break
+            linhas.append(linha)
+            usados += custo
+        linhas.append(aviso)
+        return "\n".join(linhas)
+
+    def _resumo_omitidas(self, omitidas: Sequence) -> str:
+        quantidade = sum(item.quantidade or 0 for item in omitidas)
+        lucro = sum(item.lucro_total or 0 for item in omitidas)
+        return f"(+{len(omitidas)} vendas menos relevantes omitidas: qtd total {quantidade}, lucro total {lucro:.2f})"
+
+    def montar(self, pergunta: str, dados: Sequence, resumos: str = "") -> PromptMontado:
+        """
+        Monta o prompt com as vendas `dados` (da mais para a menos relevante).
+        `resumos` são totais de todo o conjunto de dados, incluídos antes das vendas.
+        """
+        inicio = time.perf_counter()
+        abertura = f"{INSTRUCOES}\n\n"
+        if resumos:
+            abertura += f"Resumo de todas as vendas do banco de dados:\n{self._limitar_resumos(resumos)}\n\n"
+        abertura += f"Vendas mais relevantes para a pergunta ({CABECALHO_DADOS}):\n"
+        final = f"\nPergunta do usuário: {pergunta}\n\n{FECHAMENTO}"
+        disponivel = self.orcamento_tokens - self._tokens(abertura) - self._tokens(final)
+
+        # Espaço reservado para a linha de resumo, caso nem todas as vendas caibam
+        # (o resumo de todas as vendas é um limite superior para o de qualquer sobra)
+        reserva = self._tokens(self._resumo_omitidas(dados)) + 1 if dados else 0
+
+        linhas: List[str] = []
+        for posicao, item in enumerate(dados):
+            linha = linha_venda(item)
+            custo = self._tokens(linha) + 1
+            ultima = posicao == len(dados) - 1
+            if custo + (0 if ultima else reserva) > disponivel:
+                break
+            linhas.append(linha)
+            disponivel -= custo
+
+        omitidas = dados[len(linhas):]
+        if omitidas:
+            linhas.append(self._resumo_omitidas(omitidas))
+        if not dados:
+            linhas.append("(nenhuma venda relevante encontrada)")
+
+        texto = abertura + "\n".join(linhas) + "\n" + final
+        return PromptMontado(
+            texto,
+            self._tokens(texto),
+            len(dados) - len(omitidas),
+            len(omitidas),
+            (time.perf_counter() - inicio) * 1000
+        )
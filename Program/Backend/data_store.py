@@ -1,189 +1,634 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, Mapping, Set, BinaryIO
+from types import MappingProxyType
+from functools import lru_cache
+from itertools import islice
+import copy
 import csv
+import io
+import logging
 import os
-from datetime import datetime
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+from agregados_vendas import AgregadosPorGrupo
+from colunas_vendas import (
+    Categorias, ConstrutorColunas, VisaoRegiao, COLUNAS_CATEGORICAS, COLUNAS_POR_CHAVE, colunas_vazias
+)
+from indices_vendas import IndicesRegiao, IndiceGeografico
+from metricas import registrar_carga_csv
+from progresso_ingestao import ProgressoIngestao
+from snapshot_vendas import SnapshotVendas
+from config import DATASTORE_CSV, DATASTORE_LINHAS_POR_LOTE, DATASTORE_SNAPSHOT_DIR, GEO_NIVEL_MAXIMO
+
+logger = logging.getLogger(__name__)
+
+CSV_PADRAO = DATASTORE_CSV
+
+# Bytes finais da parte já lida do CSV guardados para perceber se o arquivo foi reescrito
+TAMANHO_MARCA_CSV = 4096
+
+# Mapeamento de estados para regiões usando códigos do SVG
+ESTADO_PARA_REGIAO: Mapping[str, str] = MappingProxyType({
+    # Norte
+    'BR-AC': 'Norte', 'BR-AP': 'Norte', 'BR-AM': 'Norte', 'BR-PA': 'Norte', 
+    'BR-RO': 'Norte', 'BR-RR': 'Norte', 'BR-TO': 'Norte',
+    # Nordeste
+    'BR-AL': 'Nordeste', 'BR-BA': 'Nordeste', 'BR-CE': 'Nordeste', 
+    'BR-MA': 'Nordeste', 'BR-PB': 'Nordeste', 'BR-PE': 'Nordeste', 
+    'BR-PI': 'Nordeste', 'BR-RN': 'Nordeste', 'BR-SE': 'Nordeste',
+    # Centro-Oeste
+    'BR-DF': 'CentroOeste', 'BR-GO': 'CentroOeste', 
+    'BR-MT': 'CentroOeste', 'BR-MS': 'CentroOeste',
+    # Sudeste
+    'BR-ES': 'Sudeste', 'BR-MG': 'Sudeste', 'BR-RJ': 'Sudeste', 'BR-SP': 'Sudeste',
+    # Sul
+    'BR-PR': 'Sul', 'BR-RS': 'Sul', 'BR-SC': 'Sul'
+})
+
+# Mapeamento inverso da região para o nome no CSV
+REGIAO_PARA_NOME_CSV: Mapping[str, str] = MappingProxyType({
+    'Norte': 'Norte',
+    'Nordeste': 'Nordeste',
+    'CentroOeste': 'Centro-Oeste',
+    'Sudeste': 'Sudeste',
+    'Sul': 'Sul'
+})
+
+# Mapeamento de nome CSV para região
+NOME_CSV_PARA_REGIAO: Mapping[str, str] = MappingProxyType({
+    'Norte': 'Norte',
+    'Nordeste': 'Nordeste',
+    'Centro-Oeste': 'CentroOeste',
+    'Sudeste': 'Sudeste',
+    'Sul': 'Sul'
+})
+
+# Mapeamento inverso para listar todos os estados por região
+ESTADOS_POR_REGIAO: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'Norte': ('BR-AC', 'BR-AP', 'BR-AM', 'BR-PA', 'BR-RO', 'BR-RR', 'BR-TO'),
+    'Nordeste': ('BR-AL', 'BR-BA', 'BR-CE', 'BR-MA', 'BR-PB', 'BR-PE', 'BR-PI', 'BR-RN', 'BR-SE'),
+    'CentroOeste': ('BR-DF', 'BR-GO', 'BR-MT', 'BR-MS'),
+    'Sudeste': ('BR-ES', 'BR-MG', 'BR-RJ', 'BR-SP'),
+    'Sul': ('BR-PR', 'BR-RS', 'BR-SC')
+})
+
+# Nomes completos dos estados
+NOME_ESTADO: Mapping[str, str] = MappingProxyType({
+    'BR-AC': 'Acre', 'BR-AP': 'Amapá', 'BR-AM': 'Amazonas', 'BR-PA': 'Pará', 
+    'BR-RO': 'Rondônia', 'BR-RR': 'Roraima', 'BR-TO': 'Tocantins',
+    'BR-AL': 'Alagoas', 'BR-BA': 'Bahia', 'BR-CE': 'Ceará', 
+    'BR-MA': 'Maranhão', 'BR-PB': 'Paraíba', 'BR-PE': 'Pernambuco', 
+    'BR-PI': 'Piauí', 'BR-RN': 'Rio Grande do Norte', 'BR-SE': 'Sergipe',
+    'BR-DF': 'Distrito Federal', 'BR-GO': 'Goiás', 
+    'BR-MT': 'Mato Grosso', 'BR-MS': 'Mato Grosso do Sul',
+    'BR-ES': 'Espírito Santo', 'BR-MG': 'Minas Gerais', 
+    'BR-RJ': 'Rio de Janeiro', 'BR-SP': 'São Paulo',
+    'BR-PR': 'Paraná', 'BR-RS': 'Rio Grande do Sul', 'BR-SC': 'Santa Catarina'
+})
+
+
+def normalizar_nome(nome: str) -> str:
+    """Normaliza um nome para comparação: sem acentos, minúsculo e sem espaços."""
+    sem_acentos = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii')
+    return sem_acentos.lower().replace(' ', '')
+
+
+# Índice pré-construído: nome normalizado do estado -> código (ex.: 'goias' -> 'BR-GO')
+ESTADO_POR_NOME_NORMALIZADO: Mapping[str, str] = MappingProxyType({
+    normalizar_nome(nome): codigo for codigo, nome in NOME_ESTADO.items()
+})
+
+
+def linhas_completas(arquivo: BinaryIO, posicao: List[int]) -> Iterator[str]:
+    """
+    Linhas do arquivo binário terminadas em quebra de linha, decodificadas. Para na primeira
+    sem quebra (pode estar sendo escrita): ela fica para a próxima leitura. `posicao[0]`
+    acompanha quantos bytes das linhas entregues foram consumidos.
+    """
+    for linha in arquivo:
+        if not linha.endswith(b"\n"):
+            return
+        posicao[0] += len(linha)
+        yield linha.decode('utf-8')
+
+
+@lru_cache(maxsize=1024)
+def codigo_estado(nome: str) -> Optional[str]:
+    """Retorna o código SVG (BR-XX) de um nome de estado, com ou sem acentos (ou None)."""
+    return ESTADO_POR_NOME_NORMALIZADO.get(normalizar_nome(nome))
+
+def converter_coordenada(texto: str) -> float:
+    """Latitude/longitude do CSV ('-23,5' ou '-23.5'); vazia ou inválida vira NaN, sem descartar a linha."""
+    try:
+        return float(texto.replace(',', '.'))
+    except ValueError:
+        return float('nan')
+
 
 class DataStore:
-    """Classe para gerenciar os dados de regiões e vendas."""
+    """Classe para gerenciar os dados de regiões e vendas (armazenados em colunas)."""
 
-    def __init__(self):
-        self.dados_por_regiao = self._carregar_dados_csv()
+    def __init__(self, csv_path: Optional[str] = None, diretorio_snapshot: Optional[str] = DATASTORE_SNAPSHOT_DIR):
+        self.csv_path = csv_path or CSV_PADRAO
+        self.diretorio_snapshot = diretorio_snapshot
+        # Snapshot binário das colunas (None desliga: o CSV é sempre reprocessado)
+        self.snapshot = SnapshotVendas(diretorio_snapshot, self.csv_path) if diretorio_snapshot else None
+        # Dicionários das colunas categóricas, compartilhados por todas as regiões
+        self.categorias = {nome: Categorias() for nome in COLUNAS_CATEGORICAS}
+        self.colunas_por_regiao = {regiao: colunas_vazias() for regiao in self.estados_por_regiao}
+        # Arrays com capacidade extra, dos quais colunas_por_regiao são fatias
+        self._reservas: Dict[str, Dict[str, np.ndarray]] = {}
+        # Regiões cujas reservas só esta instância usa: apenas nelas se escreve no lugar
+        self._reservas_proprias: Set[str] = set()
+        # Totais por região e por estado, mantidos a cada carga
+        self.agregados = AgregadosPorGrupo()
+        # Índices secundários por região (estado, produto, cliente e data), construídos na carga
+        # e reconstruídos sob demanda quando a região recebe novas linhas
+        self._indices_regiao: Dict[str, IndicesRegiao] = {}
+        # Grade espacial por região (None: todas), construída no primeiro pedido do mapa
+        self._indices_geo: Dict[Optional[str], IndiceGeografico] = {}
+        self._indices: Dict[str, int] = {}
+        self._proximo_id = 1
+        # Até onde o CSV foi lido (em bytes) e os últimos bytes dessa parte, para a recarga incremental
+        self.posicao_csv = 0
+        self._marca_csv = b""
+        # Incrementada a cada nova versão dos dados (recarga incremental)
+        self.versao = 1
+        if not self._carregar_snapshot() and self._carregar_dados_csv():
+            self.salvar_snapshot()
+        
+        # Construir os índices secundários uma única vez, ainda durante a carga
+        for regiao in self.colunas_por_regiao:
+            self._indices_secundarios(regiao)
 
-    # Mapeamento de estados para regiões usando códigos do SVG
+    # Os mapeamentos abaixo são tabelas congeladas do módulo (não são recriados a cada acesso)
     @property
-    def estado_para_regiao(self) -> Dict[str, str]:
-        return {
-            # Norte
-            'BR-AC': 'Norte', 'BR-AP': 'Norte', 'BR-AM': 'Norte', 'BR-PA': 'Norte', 
-            'BR-RO': 'Norte', 'BR-RR': 'Norte', 'BR-TO': 'Norte',
-            # Nordeste
-            'BR-AL': 'Nordeste', 'BR-BA': 'Nordeste', 'BR-CE': 'Nordeste', 
-            'BR-MA': 'Nordeste', 'BR-PB': 'Nordeste', 'BR-PE': 'Nordeste', 
-            'BR-PI': 'Nordeste', 'BR-RN': 'Nordeste', 'BR-SE': 'Nordeste',
-            # Centro-Oeste
-            'BR-DF': 'CentroOeste', 'BR-GO': 'CentroOeste', 
-            'BR-MT': 'CentroOeste', 'BR-MS': 'CentroOeste',
-            # Sudeste
-            'BR-ES': 'Sudeste', 'BR-MG': 'Sudeste', 'BR-RJ': 'Sudeste', 'BR-SP': 'Sudeste',
-            # Sul
-            'BR-PR': 'Sul', 'BR-RS': 'Sul', 'BR-SC': 'Sul'
-        }
+    def estado_para_regiao(self) -> Mapping[str, str]:
+        return ESTADO_PARA_REGIAO
     
-    # Mapeamento inverso da região para o nome no CSV
     @property
-    def regiao_para_nome_csv(self) -> Dict[str, str]:
-        return {
-            'Norte': 'Norte',
-            'Nordeste': 'Nordeste',
-            'CentroOeste': 'Centro-Oeste',
-            'Sudeste': 'Sudeste',
-            'Sul': 'Sul'
-        }
+    def regiao_para_nome_csv(self) -> Mapping[str, str]:
+        return REGIAO_PARA_NOME_CSV
 
-    # Mapeamento de nome CSV para região
     @property
-    def nome_csv_para_regiao(self) -> Dict[str, str]:
-        return {
-            'Norte': 'Norte',
-            'Nordeste': 'Nordeste',
-            'Centro-Oeste': 'CentroOeste',
-            'Sudeste': 'Sudeste',
-            'Sul': 'Sul'
-        }
+    def nome_csv_para_regiao(self) -> Mapping[str, str]:
+        return NOME_CSV_PARA_REGIAO
 
-    # Mapeamento inverso para listar todos os estados por região
     @property
-    def estados_por_regiao(self) -> Dict[str, List[str]]:
-        return {
-            'Norte': ['BR-AC', 'BR-AP', 'BR-AM', 'BR-PA', 'BR-RO', 'BR-RR', 'BR-TO'],
-            'Nordeste': ['BR-AL', 'BR-BA', 'BR-CE', 'BR-MA', 'BR-PB', 'BR-PE', 'BR-PI', 'BR-RN', 'BR-SE'],
-            'CentroOeste': ['BR-DF', 'BR-GO', 'BR-MT', 'BR-MS'],
-            'Sudeste': ['BR-ES', 'BR-MG', 'BR-RJ', 'BR-SP'],
-            'Sul': ['BR-PR', 'BR-RS', 'BR-SC']
-        }
+    def estados_por_regiao(self) -> Mapping[str, Tuple[str, ...]]:
+        return ESTADOS_POR_REGIAO
 
-    # Nomes completos dos estados
     @property
-    def nome_estado(self) -> Dict[str, str]:
-        return {
-            'BR-AC': 'Acre', 'BR-AP': 'Amapá', 'BR-AM': 'Amazonas', 'BR-PA': 'Pará', 
-            'BR-RO': 'Rondônia', 'BR-RR': 'Roraima', 'BR-TO': 'Tocantins',
-            'BR-AL': 'Alagoas', 'BR-BA': 'Bahia', 'BR-CE': 'Ceará', 
-            'BR-MA': 'Maranhão', 'BR-PB': 'Paraíba', 'BR-PE': 'Pernambuco', 
-            'BR-PI': 'Piauí', 'BR-RN': 'Rio Grande do Norte', 'BR-SE': 'Sergipe',
-            'BR-DF': 'Distrito Federal', 'BR-GO': 'Goiás', 
-            'BR-MT': 'Mato Grosso', 'BR-MS': 'Mato Grosso do Sul',
-            'BR-ES': 'Espírito Santo', 'BR-MG': 'Minas Gerais', 
-            'BR-RJ': 'Rio de Janeiro', 'BR-SP': 'São Paulo',
-            'BR-PR': 'Paraná', 'BR-RS': 'Rio Grande do Sul', 'BR-SC': 'Santa Catarina'
-        }
+    def nome_estado(self) -> Mapping[str, str]:
+        return NOME_ESTADO
     
-    def _carregar_dados_csv(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Carrega os dados do arquivo CSV e organiza-os por região."""
-        resultado = {
-            "Norte": [],
-            "Nordeste": [],
-            "CentroOeste": [],
-            "Sudeste": [],
-            "Sul": []
+    def _mapear_indices(self, headers: List[str]) -> Dict[str, int]:
+        """Mapeia os índices das colunas do CSV que nos interessam."""
+        return {
+            "latitude": headers.index('Latitude'),
+            "longitude": headers.index('Longitude'),
+            "data": headers.index('Data'),
+            "cpf": headers.index('CPF'),
+            "cnpj": headers.index('CNPJ'),
+            "nome_cliente": headers.index('nome_cliente'),
+            "regiao": headers.index('regiao'),
+            "estado": headers.index('estado'),
+            "produto": headers.index('produto'),
+            "quantidade": headers.index('quantidade'),
+            "estoque_atual": headers.index('estoque_atual'),
+            "valor_unitario": headers.index('valor_unitario'),
+            "lucro_total": headers.index('lucro_total'),
         }
+
+    def _processar_linhas(self, linhas: Iterable[List[str]], construtor: ConstrutorColunas) -> int:
+        """Converte linhas do CSV e as acumula no construtor de colunas. Retorna quantas linhas foram lidas."""
+        idx = self._indices
+        lidas = 0
         
-        csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dadosdosprodutos.csv')
+        for row in linhas:
+            lidas += 1
+            if len(row) >= 12:  # Verificar se a linha tem dados suficientes
+                try:
+                    # Converter data para dias desde 1970 (datetime64[D])
+                    data_dias = construtor.converter_data(row[idx["data"]])
+                    
+                    # Limpar e converter valores numéricos
+                    quantidade = int(row[idx["quantidade"]])
+                    estoque_atual = int(row[idx["estoque_atual"]])
+                    valor_unitario = float(row[idx["valor_unitario"]].replace(',', '.'))
+                    lucro_total = float(row[idx["lucro_total"]].replace(',', '.'))
+                    valor_total = quantidade * valor_unitario
+                    latitude = converter_coordenada(row[idx["latitude"]])
+                    longitude = converter_coordenada(row[idx["longitude"]])
+                    
+                    # Pegar CPF ou CNPJ
+                    cpf = row[idx["cpf"]].strip()
+                    cnpj = row[idx["cnpj"]].strip()
+                    doc_fiscal = cnpj if cnpj else cpf
+                    
+                    regiao_csv = row[idx["regiao"]]
+                    estado = row[idx["estado"]]
+                    regiao_key = NOME_CSV_PARA_REGIAO.get(regiao_csv, regiao_csv)
+                    
+                    # Corrigir o código do estado para o formato SVG (BR-XX) pelo índice de nomes
+                    codigo = codigo_estado(estado)
+                    
+                    # Se não encontrou diretamente, tente encontrar pela região
+                    if not codigo and regiao_key in ESTADOS_POR_REGIAO:
+                        # Use o primeiro estado da região como fallback
+                        estados_da_regiao = ESTADOS_POR_REGIAO[regiao_key]
+                        if estados_da_regiao:
+                            codigo = estados_da_regiao[0]
+                    
+                    # Adicionar à região correspondente
+                    if regiao_key in ESTADOS_POR_REGIAO:
+                        construtor.adicionar(regiao_key, {
+                            "id": self._proximo_id,
+                            "data": data_dias,
+                            "latitude": latitude,
+                            "longitude": longitude,
+                            "doc_fiscal": doc_fiscal,
+                            "cliente": row[idx["nome_cliente"]],
+                            "regiao": regiao_csv,
+                            "estado": codigo,
+                            "estado_nome": estado,
+                            "produto": row[idx["produto"]],
+                            "quantidade": quantidade,
+                            "estoque_atual": estoque_atual,
+                            "valor_unitario": valor_unitario,
+                            "valor": valor_total,  # Calcular valor total
+                            "lucro": lucro_total
+                        })
+                        self._proximo_id += 1
+                except (ValueError, IndexError) as e:
+                    logger.warning("Erro ao processar linha do CSV", extra={"linha": row, "erro": str(e)})
+        return lidas
+
+    def _carregar_dados_csv(self) -> bool:
+        """Carrega os dados do arquivo CSV em colunas NumPy, organizadas por região. Retorna se leu o arquivo inteiro."""
+        construtor = ConstrutorColunas(self.categorias)
+        progresso = None
+        completo = False
         
         try:
-            with open(csv_path, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file, delimiter=';')
-                headers = next(reader)  # Pular o cabeçalho
-                
-                # Mapear os índices das colunas que nos interessam
-                latitude_idx = headers.index('Latitude')
-                longitude_idx = headers.index('Longitude')
-                data_idx = headers.index('Data')
-                cpf_idx = headers.index('CPF')
-                cnpj_idx = headers.index('CNPJ')
-                nome_cliente_idx = headers.index('nome_cliente')
-                regiao_idx = headers.index('regiao')
-                estado_idx = headers.index('estado')
-                produto_idx = headers.index('produto')
-                quantidade_idx = headers.index('quantidade')
-                valor_unitario_idx = headers.index('valor_unitario')
-                lucro_total_idx = headers.index('lucro_total')
-                
-                id_counter = 1
-                
-                for row in reader:
-                    if len(row) >= 12:  # Verificar se a linha tem dados suficientes
-                        try:
-                            # Converter data para o formato ISO
-                            data_parts = row[data_idx].split('/')
-                            data_iso = f"{data_parts[2]}-{data_parts[1]}-{data_parts[0]}"
-                            
-                            # Limpar e converter valores numéricos
-                            quantidade = int(row[quantidade_idx])
-                            valor_unitario = float(row[valor_unitario_idx].replace(',', '.'))
-                            lucro_total = float(row[lucro_total_idx].replace(',', '.'))
-                            valor_total = quantidade * valor_unitario
-                            
-                            # Pegar CPF ou CNPJ
-                            cpf = row[cpf_idx].strip()
-                            cnpj = row[cnpj_idx].strip()
-                            doc_fiscal = cnpj if cnpj else cpf
-                            
-                            regiao_csv = row[regiao_idx]
-                            estado = row[estado_idx]
-                            regiao_key = self.nome_csv_para_regiao.get(regiao_csv, regiao_csv)
-                            
-                            # Corrigir o código do estado para o formato SVG (BR-XX)
-                            codigo_estado = None
-                            for codigo, nome in self.nome_estado.items():
-                                if nome.lower() == estado.lower() or nome.replace(' ', '').lower() == estado.lower():
-                                    codigo_estado = codigo
-                                    break
-                            
-                            # Se não encontrou diretamente, tente encontrar pela região
-                            if not codigo_estado and regiao_key in self.estados_por_regiao:
-                                # Use o primeiro estado da região como fallback
-                                estados_da_regiao = self.estados_por_regiao[regiao_key]
-                                if estados_da_regiao:
-                                    codigo_estado = estados_da_regiao[0]
-                            
-                            # Criar entrada de dados
-                            entrada = {
-                                "ID": id_counter,
-                                "Data": data_iso,
-                                "Latitude": row[latitude_idx].replace(',', '.'),
-                                "Longitude": row[longitude_idx].replace(',', '.'),
-                                "CPF_CNPJ": doc_fiscal,
-                                "Cliente": row[nome_cliente_idx],
-                                "Regiao": regiao_csv,
-                                "Estado": codigo_estado,
-                                "Estado_Nome": estado,
-                                "Produto": row[produto_idx],
-                                "Quantidade": quantidade,
-                                "Valor_Unitario": valor_unitario,
-                                "Valor": valor_total,  # Calcular valor total
-                                "Lucro": lucro_total
-                            }
-                            
-                            # Adicionar à região correspondente
-                            if regiao_key in resultado:
-                                resultado[regiao_key].append(entrada)
-                                id_counter += 1
-                        except (ValueError, IndexError) as e:
-                            print(f"Erro ao processar linha: {row}, Erro: {e}")
+            progresso = ProgressoIngestao("DataStore", os.path.getsize(self.csv_path))
+            with open(self.csv_path, 'rb') as file:
+                # Só linhas completas: uma última linha sem quebra fica para a recarga incremental
+                posicao = [0]
+                reader = csv.reader(linhas_completas(file, posicao), delimiter=';')
+                self._indices = self._mapear_indices(next(reader))  # Pular o cabeçalho
+                # Ler em lotes de tamanho fixo: o texto de cada lote é descartado após a
+                # conversão, só os buffers colunares compactos crescem com o arquivo
+                while True:
+                    primeiro_id = self._proximo_id
+                    lidas = self._processar_linhas(islice(reader, DATASTORE_LINHAS_POR_LOTE), construtor)
+                    if not lidas:
+                        break
+                    aceitas = self._proximo_id - primeiro_id
+                    progresso.registrar_lote(aceitas, posicao[0], lidas - aceitas)
+                self._marcar_posicao_csv(posicao[0])
+            completo = True
         except Exception as e:
-            print(f"Erro ao abrir ou processar o arquivo CSV: {e}")
-            # Se houver erro, retornamos dados vazios
+            logger.error("Erro ao abrir ou processar o arquivo CSV", extra={"arquivo": self.csv_path, "erro": str(e)})
+            # Se houver erro, seguimos com os dados carregados até aqui
+        if progresso is not None:
+            progresso.concluir()
         
-        return resultado
+        self._anexar(construtor.construir())
+        return completo
+
+    def _carregar_snapshot(self) -> bool:
+        """Carrega as colunas do snapshot binário (memory-map), se ele corresponder ao CSV atual."""
+        if self.snapshot is None:
+            return False
+        inicio = time.perf_counter()
+        try:
+            carregado = self.snapshot.carregar()
+        except Exception as e:
+            logger.warning("Snapshot do DataStore ignorado", extra={"arquivo": self.csv_path, "erro": str(e)})
+            return False
+        if carregado is None:
+            return False
+        
+        colunas_por_regiao, valores_categorias, proximo_id = carregado
+        # Só o cabeçalho do CSV é lido, para _adicionar_linhas conhecer a posição das colunas
+        with open(self.csv_path, 'r', encoding='utf-8') as file:
+            self._indices = self._mapear_indices(next(csv.reader(file, delimiter=';')))
+        for nome in COLUNAS_CATEGORICAS:
+            self.categorias[nome] = Categorias.de_valores(valores_categorias[nome])
+        self._anexar({regiao: colunas for regiao, colunas in colunas_por_regiao.items() if regiao in self.colunas_por_regiao})
+        self._proximo_id = proximo_id
+        self._marcar_posicao_csv(self.snapshot.manifesto["tamanho"])
+        
+        segundos = time.perf_counter() - inicio
+        linhas = sum(len(colunas["id"]) for colunas in self.colunas_por_regiao.values())
+        registrar_carga_csv("DataStore_snapshot", segundos, linhas)
+        logger.info("DataStore carregado do snapshot", extra={"arquivo": self.csv_path, "linhas": linhas, "segundos": segundos})
+        return True
+
+    def salvar_snapshot(self) -> None:
+        """Grava o snapshot binário das colunas carregadas do CSV (falhas só vão para o log)."""
+        if self.snapshot is None:
+            return
+        try:
+            self.snapshot.salvar(
+                self.colunas_por_regiao,
+                {nome: categorias.valores for nome, categorias in self.categorias.items()},
+                self._proximo_id,
+                self.posicao_csv
+            )
+        except Exception as e:
+            logger.warning("Não foi possível gravar o snapshot do DataStore", extra={"arquivo": self.csv_path, "erro": str(e)})
+
+    def _anexar(self, novas: Dict[str, Dict[str, np.ndarray]]) -> None:
+        """Anexa colunas novas às de cada região e atualiza os agregados."""
+        for regiao, colunas in novas.items():
+            if not len(colunas["id"]):
+                continue
+            atuais = self.colunas_por_regiao[regiao]
+            tamanho = len(atuais["id"])
+            capacidade = len(self._reservas[regiao]["id"]) if regiao in self._reservas else tamanho
+            total = tamanho + len(colunas["id"])
+            
+            if tamanho == 0:
+                # Primeira carga: usar os arrays do construtor diretamente, sem cópia
+                self._reservas[regiao] = colunas
+                self._reservas_proprias.add(regiao)
+            elif total > capacidade or regiao not in self._reservas_proprias:
+                # Crescimento amortizado: dobrar a capacidade, copiando o que já existe
+                # (também quando as reservas são de outra instância, que pode escrever nelas)
+                nova_capacidade = max(total, 2 * capacidade)
+                reservas = {}
+                for nome, coluna in atuais.items():
+                    reservas[nome] = np.empty(nova_capacidade, dtype=coluna.dtype)
+                    reservas[nome][:tamanho] = coluna
+                self._reservas[regiao] = reservas
+                self._reservas_proprias.add(regiao)
+            
+            reservas = self._reservas[regiao]
+            if tamanho:
+                for nome, coluna in colunas.items():
+                    reservas[nome][tamanho:total] = coluna
+            # Visões até o tamanho atual; visões entregues antes continuam válidas
+            self.colunas_por_regiao[regiao] = {nome: reserva[:total] for nome, reserva in reservas.items()}
+            self.agregados.acumular(regiao, colunas)
+            self._indices_regiao.pop(regiao, None)
+            self._indices_geo.pop(regiao, None)
+            self._indices_geo.pop(None, None)
+
+    def _adicionar_linhas(self, linhas: Iterable[List[str]]) -> Tuple[Dict[str, Dict[str, np.ndarray]], int]:
+        """
+        Acrescenta vendas (linhas no formato do CSV) e atualiza os agregados de forma incremental.
+        Altera a instância: só é chamado numa cópia ainda não publicada (com_linhas_acrescentadas).
+        Retorna (colunas novas por região, linhas lidas).
+        """
+        construtor = ConstrutorColunas(self.categorias)
+        lidas = self._processar_linhas(linhas, construtor)
+        novas = construtor.construir()
+        self._anexar(novas)
+        return novas, lidas
+
+    def _marcar_posicao_csv(self, posicao: int) -> None:
+        self.posicao_csv = posicao
+        inicio = max(0, posicao - TAMANHO_MARCA_CSV)
+        with open(self.csv_path, 'rb') as arquivo:
+            arquivo.seek(inicio)
+            self._marca_csv = arquivo.read(posicao - inicio)
+
+    def estado_csv(self) -> str:
+        """
+        Compara o CSV em disco com a parte já carregada: 'inalterado', 'acrescentado' (há
+        bytes novos depois do que foi lido) ou 'reescrito' (truncado ou alterado antes disso).
+        """
+        tamanho = os.path.getsize(self.csv_path)
+        if not self.posicao_csv:
+            # Nada foi lido da primeira vez (arquivo ausente ou com erro): carregar do zero
+            return "reescrito" if tamanho else "inalterado"
+        if tamanho < self.posicao_csv:
+            return "reescrito"
+        with open(self.csv_path, 'rb') as arquivo:
+            arquivo.seek(self.posicao_csv - len(self._marca_csv))
+            if arquivo.read(len(self._marca_csv)) != self._marca_csv:
+                return "reescrito"
+        return "acrescentado" if tamanho > self.posicao_csv else "inalterado"
+
+    def copiar(self) -> "DataStore":
+        """
+        Cópia para copy-on-write: compartilha os arrays das colunas (nunca alterados no lugar,
+        só estendidos na capacidade reservada, fora das visões existentes) e copia os
+        dicionários, categorias e agregados. Alterar a cópia não afeta quem ainda usa esta instância.
+        O direito de escrever na capacidade reservada passa para a cópia: se esta instância
+        receber linhas depois, ela aloca arrays novos em vez de escrever onde a cópia escreve.
+        """
+        novo = DataStore.__new__(DataStore)
+        novo.__dict__.update(self.__dict__)
+        novo.categorias = {nome: categorias.copiar() for nome, categorias in self.categorias.items()}
+        novo.colunas_por_regiao = {regiao: dict(colunas) for regiao, colunas in self.colunas_por_regiao.items()}
+        novo._reservas = {regiao: dict(reservas) for regiao, reservas in self._reservas.items()}
+        novo._reservas_proprias, self._reservas_proprias = self._reservas_proprias, set()
+        novo.agregados = copy.deepcopy(self.agregados)
+        novo._indices_regiao = dict(self._indices_regiao)
+        novo._indices_geo = dict(self._indices_geo)
+        novo.versao = self.versao + 1
+        return novo
+
+    def com_linhas_acrescentadas(self) -> Tuple["DataStore", int]:
+        """
+        Lê só as linhas completas acrescentadas ao CSV depois da última carga e retorna
+        (novo DataStore com elas, quantidade de linhas). Esta instância não é alterada;
+        sem linhas novas completas, retorna ela mesma.
+        """
+        with open(self.csv_path, 'rb') as arquivo:
+            arquivo.seek(self.posicao_csv)
+            bruto = arquivo.read()
+        # Uma última linha sem quebra pode estar sendo escrita: fica para a próxima leitura
+        fim = bruto.rfind(b"\n") + 1
+        if not fim:
+            return self, 0
+        
+        novo = self.copiar()
+        novas, lidas = novo._adicionar_linhas(csv.reader(io.StringIO(bruto[:fim].decode('utf-8')), delimiter=';'))
+        novo._marcar_posicao_csv(self.posicao_csv + fim)
+        # Índices das regiões alteradas prontos antes da troca (não na primeira requisição)
+        for regiao, colunas in novas.items():
+            if len(colunas["id"]):
+                novo._indices_secundarios(regiao)
+        return novo, lidas
+
+    @property
+    def dados_por_regiao(self) -> Dict[str, VisaoRegiao]:
+        """Visões colunares de todas as regiões."""
+        return {regiao: self.get_dados_regiao(regiao) for regiao in self.colunas_por_regiao}
 
     def get_regioes(self) -> List[str]:
         """Retorna a lista de regiões disponíveis."""
         return list(self.estados_por_regiao.keys())
 
-    def get_dados_regiao(self, regiao: str) -> List[Dict[str, Any]]:
-        """Retorna os dados de vendas para uma região específica."""
-        return self.dados_por_regiao.get(regiao, [])
+    def get_dados_regiao(self, regiao: str) -> VisaoRegiao:
+        """Retorna as vendas de uma região como views das colunas (sem cópia)."""
+        colunas = self.colunas_por_regiao.get(regiao)
+        if colunas is None:
+            return VisaoRegiao(colunas_vazias(), self.categorias)
+        return VisaoRegiao({nome: coluna[:] for nome, coluna in colunas.items()}, self.categorias)
+
+    def get_dados_regiao_dicts(self, regiao: str) -> List[Dict[str, Any]]:
+        """Retorna os dados de vendas de uma região no formato antigo (lista de dicts)."""
+        return self.get_dados_regiao(regiao).para_dicts()
+
+    def get_resumo_regiao(self, regiao: str) -> Dict[str, Any]:
+        """Retorna o resumo pré-calculado de uma região, sem percorrer as linhas."""
+        return self.agregados.regiao(regiao).resumo()
+
+    def get_resumo_estados(self, regiao: str) -> Dict[str, Dict[str, Any]]:
+        """Retorna os resumos pré-calculados de cada estado da região."""
+        categorias = self.categorias["estado"]
+        resumos = {}
+        for sigla in self.estados_por_regiao.get(regiao, []):
+            codigo = categorias.codigo(sigla)
+            if codigo is not None:
+                resumos[sigla] = self.agregados.estado(codigo).resumo()
+        return resumos
+
+    def get_estoque_regiao(self, regiao: str) -> List[Dict[str, Any]]:
+        """Retorna os dados do gráfico de estoque de uma região."""
+        return self.agregados.estoque(regiao, self.categorias["produto"].valores)
+
+    def _indices_secundarios(self, regiao: str) -> IndicesRegiao:
+        """Retorna os índices secundários da região, construindo-os se necessário."""
+        indices = self._indices_regiao.get(regiao)
+        colunas = self.colunas_por_regiao[regiao]
+        if indices is None or indices.tamanho != len(colunas["id"]):
+            indices = IndicesRegiao(colunas)
+            self._indices_regiao[regiao] = indices
+        return indices
+
+    def indice_geografico(self, regiao: Optional[str] = None) -> IndiceGeografico:
+        """Grade espacial das vendas da região (ou de todas), construída no primeiro uso."""
+        indice = self._indices_geo.get(regiao)
+        if indice is None:
+            regioes = [regiao] if regiao is not None else list(self.colunas_por_regiao)
+            colunas = [self.colunas_por_regiao[nome] for nome in regioes]
+            indice = IndiceGeografico(
+                *(np.concatenate([c[nome] for c in colunas]) for nome in ("latitude", "longitude", "valor", "lucro")),
+                nivel_maximo=GEO_NIVEL_MAXIMO
+            )
+            self._indices_geo[regiao] = indice
+        return indice
+
+    def _chave_ordenacao(self, colunas: Dict[str, np.ndarray], nome: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna a coluna usada para ordenar (categóricas em ordem alfabética) e a máscara de nulos."""
+        coluna = colunas[nome]
+        if nome in COLUNAS_CATEGORICAS:
+            categorias = self.categorias[nome]
+            nulos = np.array([valor is None for valor in categorias.valores], dtype=bool)
+            return categorias.ranques()[coluna], nulos[coluna]
+        if nome == "data":
+            return coluna.view(np.int64), np.isnat(coluna)
+        if coluna.dtype.kind == "f":
+            return coluna, np.isnan(coluna)
+        return coluna, np.zeros(len(coluna), dtype=bool)
+
+    def consultar_regiao(
+        self,
+        regiao: str,
+        estado: Optional[str] = None,
+        produto: Optional[str] = None,
+        cliente: Optional[str] = None,
+        data_inicio: Optional[str] = None,
+        data_fim: Optional[str] = None,
+        ordenar: str = "ID",
+        decrescente: bool = False,
+        cursor: Optional[int] = None,
+        limite: Optional[int] = None,
+    ) -> Tuple[VisaoRegiao, int, Optional[int]]:
+        """
+        Filtra, ordena e pagina (por keyset) as vendas de uma região usando os índices.
+
+        O cursor é o ID da última linha da página anterior; a paginação segue a ordem
+        (chave de ordenação, ID), com os nulos no fim nos dois sentidos. Retorna a página,
+        o total filtrado e o próximo cursor.
+        Lança ValueError para campos, datas ou cursores inválidos.
+        """
+        colunas = self.colunas_por_regiao.get(regiao)
+        if colunas is None:
+            return VisaoRegiao(colunas_vazias(), self.categorias), 0, None
+        if ordenar not in COLUNAS_POR_CHAVE:
+            raise ValueError(f"Campo de ordenação inválido: '{ordenar}'")
+
+        # Filtros categóricos: um valor desconhecido significa resultado vazio
+        codigos = {}
+        for nome, valor in (("estado", estado), ("produto", produto), ("cliente", cliente)):
+            if valor is not None:
+                codigo = self.categorias[nome].codigo(valor)
+                codigos[nome] = codigo if codigo is not None else -1
+        try:
+            inicio = np.datetime64(data_inicio, "D") if data_inicio else None
+            fim = np.datetime64(data_fim, "D") if data_fim else None
+        except ValueError:
+            raise ValueError("Data inválida: use o formato AAAA-MM-DD")
+
+        indices = self._indices_secundarios(regiao)
+        posicoes = indices.filtrar(codigos, inicio, fim)
+        nome_ordenacao = COLUNAS_POR_CHAVE[ordenar]
+        ordenacao = indices.ordenacao(nome_ordenacao, lambda: self._chave_ordenacao(colunas, nome_ordenacao))
+        ordem, posto = ordenacao.ordens[decrescente], ordenacao.postos[decrescente]
+        if posicoes is None:
+            # Sem filtros: a ordem pré-calculada já é o resultado
+            linhas = ordem
+            postos = None
+        else:
+            # Postos das linhas filtradas, em ordem: a página é uma fatia deles
+            postos = np.sort(posto[posicoes])
+            linhas = ordem[postos]
+        total = len(linhas)
+
+        # Keyset: começar logo depois da linha do cursor, pelo posto dela na ordem (busca binária)
+        primeira = 0
+        if cursor is not None:
+            pos_cursor = np.searchsorted(colunas["id"], cursor)
+            if pos_cursor >= len(colunas["id"]) or colunas["id"][pos_cursor] != cursor:
+                raise ValueError(f"Cursor inválido: '{cursor}'")
+            posto_cursor = posto[pos_cursor]
+            if postos is None:
+                primeira = int(posto_cursor) + 1
+            else:
+                primeira = int(np.searchsorted(postos, posto_cursor, side="right"))
+
+        ultima = total if limite is None else min(primeira + limite, total)
+        pagina = VisaoRegiao(colunas, self.categorias).filtrar(linhas[primeira:ultima])
+        proximo_cursor = int(colunas["id"][linhas[ultima - 1]]) if ultima < total and ultima > primeira else None
+        return pagina, total, proximo_cursor
+
+# Instância única do processo, carregada no primeiro uso (ou no aquecimento da aplicação)
+_data_store: Optional[DataStore] = None
+_trava_data_store = threading.Lock()
+
+
+def obter_data_store() -> DataStore:
+    """Retorna o DataStore do processo, carregando o CSV (ou o snapshot) na primeira chamada."""
+    global _data_store
+    if _data_store is None:
+        with _trava_data_store:
+            if _data_store is None:
+                _data_store = DataStore()
+    return _data_store
+
+
+def definir_data_store(store: DataStore) -> None:
+    """Substitui o DataStore do processo (benchmarks e recarga dos dados)."""
+    global _data_store
+    _data_store = store
+
+
+def data_store_carregado() -> bool:
+    return _data_store is not None
+
 
-# Instância singleton para acesso aos dados
-data_store = DataStore() 
\ No newline at end of file
+def __getattr__(nome: str):
+    # Compatibilidade: `from data_store import data_store` continua funcionando (e carrega os dados)
+    if nome == "data_store":
+        return obter_data_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
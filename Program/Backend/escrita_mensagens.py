@@ -0,0 +1,118 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import bindparam, insert, update
+
+from banco import nova_sessao
+from models import Chat, Message
+
+logger = logging.getLogger(__name__)
+
+
+class EscritaMensagens:
+    """
+    Escrita adiada (write-behind) das mensagens do chat.
+
+    As mensagens ficam numa fila em memória e uma thread as grava em lote a cada
+    `intervalo` segundos, ou assim que a fila chega a `max_lote`: um INSERT de várias
+    linhas para as mensagens e um UPDATE de updated_at por chat. `parar()` grava o
+    que estiver pendente (chamado no desligamento da aplicação).
+    """
+
+    def __init__(self, intervalo: float = 0.05, max_lote: int = 500):
+        self.intervalo = intervalo
+        self.max_lote = max_lote
+        self._pendentes: List[Dict[str, Any]] = []
+        self._condicao = threading.Condition()
+        # Serializa as gravações (thread de fundo e descargas explícitas)
+        self._gravacao = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._parar = False
+        self.lotes_gravados = 0
+        self.mensagens_gravadas = 0
+
+    def enfileirar(self, chat_id: int, content: str, sender: str) -> None:
+        """Coloca a mensagem na fila (o timestamp é o do recebimento, não o da gravação)."""
+        with self._condicao:
+            if self._thread is None:
+                self._parar = False
+                self._thread = threading.Thread(target=self._executar, name="escrita-mensagens", daemon=True)
+                self._thread.start()
+            self._pendentes.append({
+                "chat_id": chat_id,
+                "content": content,
+                "sender": sender,
+                "timestamp": datetime.now()
+            })
+            if len(self._pendentes) >= self.max_lote:
+                self._condicao.notify()
+
+    @property
+    def pendentes(self) -> int:
+        with self._condicao:
+            return len(self._pendentes)
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                if not self._parar and len(self._pendentes) < self.max_lote:
+                    self._condicao.wait(self.intervalo)
+                if self._parar:
+                    return
+            self.descarregar()
+
+    def descarregar(self) -> None:
+        """Grava imediatamente tudo o que está na fila."""
+        with self._gravacao:
+            with self._condicao:
+                lote, self._pendentes = self._pendentes, []
+            if lote:
+                self._gravar(lote)
+
+    def _gravar(self, lote: List[Dict[str, Any]]) -> None:
+        try:
+            self._gravar_lote(lote)
+        except Exception as e:
+            # Um chat inválido (ex.: excluído) não deve derrubar o lote dos demais
+            logger.warning("Erro ao gravar lote de mensagens; gravando por chat",
+                           extra={"mensagens": len(lote), "erro": str(e)})
+            por_chat: Dict[int, List[Dict[str, Any]]] = {}
+            for mensagem in lote:
+                por_chat.setdefault(mensagem["chat_id"], []).append(mensagem)
+            for chat_id, mensagens in por_chat.items():
+                try:
+                    self._gravar_lote(mensagens)
+                except Exception as erro_chat:
+                    logger.error("Erro ao gravar mensagens do chat",
+                                 extra={"chat_id": chat_id, "mensagens": len(mensagens), "erro": str(erro_chat)})
+
+    def _gravar_lote(self, lote: List[Dict[str, Any]]) -> None:
+        # Última mensagem de cada chat define o novo updated_at
+        ultimas: Dict[int, datetime] = {}
+        for mensagem in lote:
+            ultimas[mensagem["chat_id"]] = mensagem["timestamp"]
+
+        with nova_sessao() as session:
+            conexao = session.connection()
+            conexao.execute(insert(Message.__table__), lote)
+            conexao.execute(
+                update(Chat.__table__)
+                .where(Chat.__table__.c.id == bindparam("chat_id"))
+                .values(updated_at=bindparam("momento")),
+                [{"chat_id": chat_id, "momento": momento} for chat_id, momento in ultimas.items()]
+            )
+            session.commit()
+        self.lotes_gravados += 1
+        self.mensagens_gravadas += len(lote)
+
+    def parar(self) -> None:
+        """Encerra a thread de gravação e grava as mensagens pendentes."""
+        with self._condicao:
+            thread, self._thread = self._thread, None
+            self._parar = True
+            self._condicao.notify()
+        if thread is not None:
+            thread.join()
+        self.descarregar()
@@ -0,0 +1,257 @@
+import json
+import os
+import pickle
+import re
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sqlmodel import select
+
+from models import Vendas
+
+try:
+    import fcntl
+except ImportError:  # Windows: trava com msvcrt
+    fcntl = None
+    import msvcrt
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+# Trava entre processos (API, importar_csv) durante o salvamento
+ARQUIVO_TRAVA = "indice.lock"
+# Nome antigo (sem versão) do vetorizador, lido de manifestos gravados antes da versão no nome
+ARQUIVO_VETORIZADOR = "vetorizador.pkl"
+ARRAYS_MATRIZ = ("data", "indices", "indptr", "ids")
+# Arquivos de uma versão do índice: vetorizador-<versao>.pkl e <array>-<versao>.npy
+PADRAO_ARQUIVO_VERSAO = re.compile(r"^(?:vetorizador|%s)-(\d+)\.(?:pkl|npy)$" % "|".join(ARRAYS_MATRIZ))
+
+
+def texto_venda(item) -> str:
+    """Texto de uma venda usado para indexação (mesmo formato usado na busca original)."""
+    texto = f"Região: {item.regiao}, Cliente: {item.nome_cliente}, Produto: {item.produto}, "
+    texto += f"Quantidade: {item.quantidade}, Valor: {item.valor_unitario}, Lucro: {item.lucro_total}"
+    return texto
+
+
+@contextmanager
+def trava_entre_processos(caminho: str) -> Iterator[None]:
+    """Trava exclusiva num arquivo, liberada pelo sistema se o processo morrer."""
+    with open(caminho, 'a+b') as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+        else:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def novo_vetorizador() -> TfidfVectorizer:
+    return TfidfVectorizer(
+        stop_words='english',
+        ngram_range=(1, 2),
+        max_features=1000
+    )
+
+
+class IndiceVetorial:
+    """
+    Índice TF-IDF persistente das vendas para o chat (RAG).
+
+    O vetorizador é ajustado uma vez e salvo junto com a matriz esparsa dos documentos
+    (normalizada em L2, então o produto escalar já é a similaridade do cosseno). Na
+    inicialização os arrays da matriz são abertos com memory-map. Vendas novas são
+    transformadas com o vocabulário existente e anexadas, sem reajustar o vetorizador;
+    quando crescem além de `fator_reconstrucao`, o índice é reconstruído por completo.
+    """
+
+    def __init__(self, diretorio: str, fator_reconstrucao: float = 0.5):
+        self.diretorio = diretorio
+        self.fator_reconstrucao = fator_reconstrucao
+        self.vetorizador: Optional[TfidfVectorizer] = None
+        self.matriz: Optional[sparse.csr_matrix] = None
+        self.ids = np.empty(0, dtype=np.int64)
+        # Número de documentos quando o vetorizador foi ajustado
+        self.docs_no_ajuste = 0
+        self.versao = 0
+        self._mtime_manifesto: Optional[float] = None
+        # Serializa leituras e atualizações (o serviço consulta o índice a partir do pool de threads)
+        self._trava = threading.RLock()
+        self.carregar()
+
+    @property
+    def pronto(self) -> bool:
+        return self.vetorizador is not None and self.matriz is not None
+
+    @property
+    def max_id(self) -> int:
+        return int(self.ids.max()) if len(self.ids) else 0
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio, nome)
+
+    def carregar(self) -> bool:
+        """Abre o índice salvo em disco (arrays com memory-map). Retorna False se não existir."""
+        with self._trava:
+            caminho_manifesto = self._caminho(ARQUIVO_MANIFESTO)
+            if not os.path.exists(caminho_manifesto):
+                return False
+            with open(caminho_manifesto, 'r', encoding='utf-8') as arquivo:
+                manifesto = json.load(arquivo)
+            versao = manifesto["versao"]
+            with open(self._caminho(manifesto.get("vetorizador", ARQUIVO_VETORIZADOR)), 'rb') as arquivo:
+                self.vetorizador = pickle.load(arquivo)
+            arrays = {
+                nome: np.load(self._caminho(f"{nome}-{versao}.npy"), mmap_mode='r')
+                for nome in ARRAYS_MATRIZ
+            }
+            self.matriz = sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=(manifesto["num_docs"], manifesto["num_termos"]),
+                copy=False
+            )
+            self.ids = arrays["ids"]
+            self.docs_no_ajuste = manifesto["docs_no_ajuste"]
+            self.versao = versao
+            self._mtime_manifesto = os.path.getmtime(caminho_manifesto)
+            return True
+
+    def recarregar_se_alterado(self) -> None:
+        """Recarrega o índice se outro processo (ex.: importar_csv) o atualizou em disco."""
+        with self._trava:
+            caminho_manifesto = self._caminho(ARQUIVO_MANIFESTO)
+            if os.path.exists(caminho_manifesto) and os.path.getmtime(caminho_manifesto) != self._mtime_manifesto:
+                self.carregar()
+
+    def _ler_manifesto(self) -> dict:
+        try:
+            with open(self._caminho(ARQUIVO_MANIFESTO), 'r', encoding='utf-8') as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
+            return {}
+
+    def salvar(self) -> None:
+        """
+        Grava o índice em disco. Todos os arquivos levam a versão no nome e o manifesto,
+        que aponta para eles, é trocado por último, de forma atômica: quem carrega ao mesmo
+        tempo lê a versão anterior inteira ou a nova inteira. Outro processo (ex.: importar_csv)
+        pode salvar ao mesmo tempo: a trava em ARQUIVO_TRAVA faz os dois escolherem versões
+        diferentes e impede que um apague os arquivos que o outro acabou de publicar.
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+        with trava_entre_processos(self._caminho(ARQUIVO_TRAVA)):
+            anterior = self._ler_manifesto()
+            versao_anterior = int(anterior.get("versao", 0))
+            # Acima da versão em disco, mesmo que outro processo tenha salvo depois da nossa carga
+            self.versao = max(self.versao, versao_anterior) + 1
+            matriz = self.matriz
+            arrays = {"data": matriz.data, "indices": matriz.indices, "indptr": matriz.indptr, "ids": self.ids}
+            for nome, valores in arrays.items():
+                self._gravar(f"{nome}-{self.versao}.npy", lambda arquivo: np.save(arquivo, np.asarray(valores)))
+            arquivo_vetorizador = f"vetorizador-{self.versao}.pkl"
+            self._gravar(arquivo_vetorizador, lambda arquivo: pickle.dump(self.vetorizador, arquivo))
+
+            manifesto = {
+                "versao": self.versao,
+                "vetorizador": arquivo_vetorizador,
+                "num_docs": matriz.shape[0],
+                "num_termos": matriz.shape[1],
+                "docs_no_ajuste": self.docs_no_ajuste,
+                "max_id": self.max_id,
+            }
+            self._gravar(ARQUIVO_MANIFESTO, lambda arquivo: arquivo.write(json.dumps(manifesto).encode('utf-8')))
+            self._mtime_manifesto = os.path.getmtime(self._caminho(ARQUIVO_MANIFESTO))
+
+            self._remover_versoes_antigas(
+                manter=(self.versao, versao_anterior),
+                manter_vetorizador_antigo=bool(anterior) and "vetorizador" not in anterior
+            )
+
+    def _gravar(self, nome: str, escrever) -> None:
+        """Escreve num arquivo temporário e o move para `nome` de forma atômica."""
+        temporario = self._caminho(f"{nome}.{os.getpid()}.tmp")
+        with open(temporario, 'wb') as arquivo:
+            escrever(arquivo)
+        os.replace(temporario, self._caminho(nome))
+
+    def _remover_versoes_antigas(self, manter: Sequence[int], manter_vetorizador_antigo: bool) -> None:
+        """
+        Remove os arquivos de versões anteriores à última substituída. A versão anterior fica
+        até o próximo salvamento: outro processo pode estar no meio da carga dela.
+        """
+        for nome in os.listdir(self.diretorio):
+            encontrado = PADRAO_ARQUIVO_VERSAO.match(nome)
+            antigo = nome == ARQUIVO_VETORIZADOR and not manter_vetorizador_antigo
+            if antigo or (encontrado and int(encontrado.group(1)) not in manter):
+                try:
+                    os.remove(self._caminho(nome))
+                except OSError:
+                    pass
+
+    def construir(self, vendas: Sequence) -> None:
+        """Ajusta o vetorizador e a matriz com todas as vendas e salva o índice."""
+        with self._trava:
+            self.vetorizador = novo_vetorizador()
+            if vendas:
+                self.matriz = self.vetorizador.fit_transform([texto_venda(item) for item in vendas]).tocsr()
+            else:
+                self.vetorizador.fit(["vazio"])
+                self.matriz = sparse.csr_matrix((0, len(self.vetorizador.vocabulary_)))
+            self.ids = np.array([item.id for item in vendas], dtype=np.int64)
+            self.docs_no_ajuste = len(vendas)
+            self.salvar()
+
+    def atualizar(self, novas_vendas: Sequence) -> None:
+        """Anexa vendas novas ao índice sem reajustar o vetorizador (reconstrói se cresceu demais)."""
+        with self._trava:
+            if not self.pronto:
+                raise RuntimeError("Índice vetorial ainda não foi construído")
+            # IDs são crescentes: só entram vendas posteriores à última indexada
+            max_id = self.max_id
+            novas = [item for item in novas_vendas if item.id > max_id]
+            if not novas:
+                return
+            novos_docs = self.vetorizador.transform([texto_venda(item) for item in novas])
+            self.matriz = sparse.vstack([self.matriz, novos_docs], format='csr')
+            self.ids = np.concatenate([self.ids, np.array([item.id for item in novas], dtype=np.int64)])
+            self.salvar()
+
+    def sincronizar(self, session) -> int:
+        """Indexa as vendas do banco com ID maior que o último indexado. Retorna quantas entraram."""
+        with self._trava:
+            if not self.pronto:
+                vendas = session.exec(select(Vendas).order_by(Vendas.id)).all()
+                self.construir(vendas)
+                return len(vendas)
+            novas = session.exec(select(Vendas).where(Vendas.id > self.max_id).order_by(Vendas.id)).all()
+            if novas:
+                self.atualizar(novas)
+                if self.precisa_reconstruir():
+                    self.construir(session.exec(select(Vendas).order_by(Vendas.id)).all())
+            return len(novas)
+
+    def precisa_reconstruir(self) -> bool:
+        """Indica se muitas vendas foram anexadas desde o último ajuste do vetorizador."""
+        return len(self.ids) > self.docs_no_ajuste * (1 + self.fator_reconstrucao)
+
+    def buscar(self, consulta: str, top_k: int = 5) -> List[int]:
+        """Retorna os IDs das top_k vendas mais similares à consulta, da mais para a menos similar."""
+        with self._trava:
+            if not self.pronto or self.matriz.shape[0] == 0:
+                return []
+            vetor_consulta = self.vetorizador.transform([consulta])
+            similaridades = (self.matriz @ vetor_consulta.T).toarray().ravel()
+            k = min(top_k, len(similaridades))
+            # argpartition seleciona os k maiores em O(n); só eles são ordenados
+            candidatos = np.argpartition(-similaridades, k - 1)[:k]
+            candidatos = candidatos[np.argsort(-similaridades[candidatos], kind="stable")]
+            return [int(self.ids[i]) for i in candidatos]
@@ -0,0 +1,11 @@
+-- Índices das tabelas de chat criadas pelo SQLModel (chat e message)
+
+-- Listagem de chats ordenada e paginada por updated_at (keyset com desempate pelo id);
+-- o mesmo índice declarado em models.Chat
+CREATE INDEX IF NOT EXISTS ix_chat_updated_at_id ON chat (updated_at, id);
+-- Índice antigo, só de updated_at (o composto acima o substitui)
+DROP INDEX IF EXISTS ix_chat_updated_at;
+
+-- Histórico de mensagens de um chat (filtro por chat_id, ordem e cursores por timestamp);
+-- também atende a contagem de mensagens por chat
+CREATE INDEX IF NOT EXISTS ix_message_chat_id_timestamp ON message (chat_id, timestamp);
@@ -0,0 +1,211 @@
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+# Colunas categóricas que recebem índice secundário
+COLUNAS_INDEXADAS = ("estado", "produto", "cliente")
+
+
+class IndiceCategorico:
+    """Índice de uma coluna categórica: código -> posições das linhas (em ordem crescente)."""
+
+    def __init__(self, codigos: np.ndarray):
+        # argsort estável mantém as posições de cada código em ordem crescente
+        self.ordem = np.argsort(codigos, kind="stable")
+        self.codigos, self.inicios, self.contagens = np.unique(
+            codigos[self.ordem], return_index=True, return_counts=True
+        )
+
+    def posicoes(self, codigo: int) -> np.ndarray:
+        i = np.searchsorted(self.codigos, codigo)
+        if i >= len(self.codigos) or self.codigos[i] != codigo:
+            return np.empty(0, dtype=np.intp)
+        inicio = self.inicios[i]
+        return self.ordem[inicio:inicio + self.contagens[i]]
+
+
+class IndiceData:
+    """Índice ordenado por data, para consultas por intervalo."""
+
+    def __init__(self, datas: np.ndarray):
+        self.ordem = np.argsort(datas, kind="stable")
+        self.datas = datas[self.ordem]
+
+    def posicoes(self, inicio: Optional[np.datetime64], fim: Optional[np.datetime64]) -> np.ndarray:
+        i = np.searchsorted(self.datas, inicio, side="left") if inicio is not None else 0
+        j = np.searchsorted(self.datas, fim, side="right") if fim is not None else len(self.datas)
+        return np.sort(self.ordem[i:j])
+
+
+class OrdemColuna:
+    """
+    Ordem das linhas por (chave, ID) nos dois sentidos, com os nulos sempre no fim (como
+    NULLS LAST no banco), e o posto de cada linha em cada ordem.
+    """
+
+    def __init__(self, chave: np.ndarray, nulos: np.ndarray, ids: np.ndarray):
+        crescente = np.lexsort((ids, chave, nulos))
+        validas = len(crescente) - int(np.count_nonzero(nulos))
+        # Decrescente: as linhas com chave invertidas, depois os nulos por ID decrescente
+        decrescente = np.concatenate([crescente[:validas][::-1], crescente[validas:][::-1]])
+        self.ordens = {False: crescente, True: decrescente}
+        self.postos = {}
+        for sentido, ordem in self.ordens.items():
+            posto = np.empty(len(ordem), dtype=np.intp)
+            posto[ordem] = np.arange(len(ordem))
+            self.postos[sentido] = posto
+
+
+class IndicesRegiao:
+    """Índices secundários (estado, produto, cliente e data) das colunas de uma região."""
+
+    def __init__(self, colunas: Dict[str, np.ndarray]):
+        self.tamanho = len(colunas["id"])
+        self.ids = colunas["id"]
+        self.categoricos = {nome: IndiceCategorico(colunas[nome]) for nome in COLUNAS_INDEXADAS}
+        self.data = IndiceData(colunas["data"])
+        # Ordens por coluna de ordenação, calculadas na primeira consulta que as usa
+        self.ordenacoes: Dict[str, OrdemColuna] = {}
+
+    def ordenacao(self, nome: str, chave: Callable[[], Tuple[np.ndarray, np.ndarray]]) -> OrdemColuna:
+        """Ordem das linhas pela coluna; `chave` retorna (chave de ordenação, máscara de nulos)."""
+        ordem = self.ordenacoes.get(nome)
+        if ordem is None:
+            ordem = OrdemColuna(*chave(), self.ids)
+            self.ordenacoes[nome] = ordem
+        return ordem
+
+    def filtrar(
+        self,
+        codigos: Dict[str, int],
+        data_inicio: Optional[np.datetime64] = None,
+        data_fim: Optional[np.datetime64] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Retorna as posições (ordenadas) das linhas que atendem a todos os filtros.
+        Retorna None quando não há filtro algum (todas as linhas).
+        """
+        conjuntos: List[np.ndarray] = [
+            self.categoricos[nome].posicoes(codigo) for nome, codigo in codigos.items()
+        ]
+        if data_inicio is not None or data_fim is not None:
+            conjuntos.append(self.data.posicoes(data_inicio, data_fim))
+        if not conjuntos:
+            return None
+
+        # Intersectar a partir do menor conjunto
+        conjuntos.sort(key=len)
+        posicoes = conjuntos[0]
+        for outro in conjuntos[1:]:
+            if not len(posicoes):
+                break
+            posicoes = np.intersect1d(posicoes, outro, assume_unique=True)
+        return posicoes
+
+
+def tamanho_celula(nivel: int) -> float:
+    """Lado (em graus) das células da grade no nível de zoom."""
+    return 360.0 / (1 << nivel)
+
+
+def formatar_celula(
+    nivel: int, coluna: int, linha: int, vendas: float, faturamento: float, lucro: float,
+    soma_lat: float, soma_lon: float
+) -> Dict[str, Any]:
+    """Célula no formato da API do mapa: centróide das vendas, limites e totais."""
+    tamanho = tamanho_celula(nivel)
+    lat, lon = linha * tamanho - 90, coluna * tamanho - 180
+    return {
+        "lat": soma_lat / vendas,
+        "lon": soma_lon / vendas,
+        "limites": [lat, lon, lat + tamanho, lon + tamanho],
+        "vendas": int(vendas),
+        "faturamento": float(faturamento),
+        "lucro": float(lucro),
+    }
+
+
+class IndiceGeografico:
+    """
+    Índice espacial das vendas numa grade uniforme de latitude/longitude, em vários níveis.
+
+    No nível z as células têm 360/2^z graus de lado e são numeradas (coluna, linha) a
+    partir de (-180, -90). As células do nível máximo são calculadas das coordenadas; cada
+    nível acima junta 2x2 células do de baixo. Assim todos os níveis ficam pré-agregados
+    (vendas, faturamento, lucro e soma das coordenadas, para o centróide), em arrays
+    ordenados por (coluna, linha).
+    """
+
+    MEDIDAS = ("vendas", "faturamento", "lucro", "soma_lat", "soma_lon")
+
+    def __init__(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        valores: np.ndarray,
+        lucros: np.ndarray,
+        nivel_maximo: int = 14,
+    ):
+        self.nivel_maximo = nivel_maximo
+        validas = (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+        latitudes, longitudes = latitudes[validas], longitudes[validas]
+
+        tamanho = tamanho_celula(nivel_maximo)
+        colunas = np.minimum(((longitudes + 180) / tamanho).astype(np.int64), (1 << nivel_maximo) - 1)
+        linhas = np.minimum(((latitudes + 90) / tamanho).astype(np.int64), (1 << max(nivel_maximo - 1, 0)) - 1)
+        self.niveis: Dict[int, Dict[str, np.ndarray]] = {}
+        self.niveis[nivel_maximo] = self._agregar(colunas, linhas, {
+            "vendas": np.ones(len(latitudes)),
+            "faturamento": valores[validas],
+            "lucro": lucros[validas],
+            "soma_lat": latitudes,
+            "soma_lon": longitudes,
+        })
+        for nivel in range(nivel_maximo - 1, -1, -1):
+            abaixo = self.niveis[nivel + 1]
+            self.niveis[nivel] = self._agregar(
+                abaixo["coluna"] >> 1, abaixo["linha"] >> 1, {nome: abaixo[nome] for nome in self.MEDIDAS}
+            )
+
+    @staticmethod
+    def _agregar(colunas: np.ndarray, linhas: np.ndarray, medidas: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        chaves, inverso = np.unique((colunas << 32) | linhas, return_inverse=True)
+        celulas = {"chave": chaves, "coluna": chaves >> 32, "linha": chaves & 0xFFFFFFFF}
+        for nome, valores in medidas.items():
+            celulas[nome] = np.bincount(inverso, weights=valores, minlength=len(chaves))
+        return celulas
+
+    def _posicoes(self, nivel: int, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Posições, no nível, das células que tocam o retângulo."""
+        celulas = self.niveis[nivel]
+        tamanho = tamanho_celula(nivel)
+        coluna_inicial, coluna_final = int((min_lon + 180) // tamanho), int((max_lon + 180) // tamanho)
+        linha_inicial, linha_final = int((min_lat + 90) // tamanho), int((max_lat + 90) // tamanho)
+        # Chaves ordenadas por coluna: o intervalo de colunas é uma fatia contígua
+        inicio = np.searchsorted(celulas["chave"], coluna_inicial << 32)
+        fim = np.searchsorted(celulas["chave"], (coluna_final + 1) << 32)
+        linhas = celulas["linha"][inicio:fim]
+        return inicio + np.flatnonzero((linhas >= linha_inicial) & (linhas <= linha_final))
+
+    def consultar(
+        self,
+        nivel: int,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        max_celulas: Optional[int] = None,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Células do retângulo no nível pedido, já agregadas. Se passarem de `max_celulas`,
+        usa o nível mais detalhado abaixo dele que caiba. Retorna (nível usado, células).
+        """
+        nivel = min(nivel, self.nivel_maximo)
+        posicoes = self._posicoes(nivel, min_lat, min_lon, max_lat, max_lon)
+        while max_celulas is not None and len(posicoes) > max_celulas and nivel > 0:
+            nivel -= 1
+            posicoes = self._posicoes(nivel, min_lat, min_lon, max_lat, max_lon)
+
+        celulas = self.niveis[nivel]
+        colunas = [celulas[nome][posicoes].tolist() for nome in ("coluna", "linha", *self.MEDIDAS)]
+        return nivel, [formatar_celula(nivel, *valores) for valores in zip(*colunas)]
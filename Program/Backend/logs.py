@@ -0,0 +1,41 @@
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from config import LOG_NIVEL, LOG_FORMATO
+
+# Atributos padrão de um LogRecord; os demais vêm de `extra=` e entram como campos do evento
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class FormatoJson(logging.Formatter):
+    """Um objeto JSON por linha: momento, nível, logger, mensagem e os campos de `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        evento = {
+            "momento": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        for nome, valor in vars(record).items():
+            if nome not in _ATRIBUTOS_PADRAO and not nome.startswith("_"):
+                evento[nome] = valor
+        if record.exc_info:
+            evento["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+def configurar_logging(nivel: str = LOG_NIVEL, formato: str = LOG_FORMATO) -> None:
+    """Configura o logger raiz da aplicação (chamado na criação do app e pelos scripts)."""
+    saida = logging.StreamHandler(sys.stderr)
+    if formato == "json":
+        saida.setFormatter(FormatoJson())
+    else:
+        saida.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    raiz = logging.getLogger()
+    raiz.handlers = [saida]
+    raiz.setLevel(nivel.upper())
+    # Cada chamada ao Ollama geraria uma linha INFO do httpx
+    logging.getLogger("httpx").setLevel(max(raiz.level, logging.WARNING))
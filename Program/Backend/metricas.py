@@ -0,0 +1,240 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites (segundos) dos histogramas de latência
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Tipo de conteúdo do formato texto de exposição do Prometheus
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_valor(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._trava = threading.Lock()
+
+    def _chave(self, rotulos: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(rotulos.get(nome, "")) for nome in self.rotulos)
+
+    def _cabecalho(self) -> List[str]:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+    def exportar(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (requisições, consultas, erros)."""
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, valor: float = 1.0, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def exportar(self) -> List[str]:
+        with self._trava:
+            valores = list(self._valores.items())
+        return self._cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_valor(valor)}"
+            for chave, valor in valores
+        ]
+
+
+class Medidor(_Metrica):
+    """Valor que sobe e desce (tempo da última carga, linhas carregadas)."""
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def definir(self, valor: float, **rotulos) -> None:
+        with self._trava:
+            self._valores[self._chave(rotulos)] = valor
+
+    def exportar(self) -> List[str]:
+        with self._trava:
+            valores = list(self._valores.items())
+        return self._cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_valor(valor)}"
+            for chave, valor in valores
+        ]
+
+
+class Histograma(_Metrica):
+    """Distribuição de durações em faixas acumuladas, com soma e contagem."""
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Por conjunto de rótulos: [contagem por faixa..., soma]
+        self._valores: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observar(self, valor: float, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._trava:
+            serie = self._valores.get(chave)
+            if serie is None:
+                serie = self._valores[chave] = [0.0] * (len(self.buckets) + 1)
+            for posicao, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[posicao] += 1
+                    break
+            serie[-1] += valor
+
+    @contextmanager
+    def medir(self, **rotulos) -> Iterator[None]:
+        """Observa a duração do bloco `with`."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def exportar(self) -> List[str]:
+        with self._trava:
+            valores = [(chave, list(serie)) for chave, serie in self._valores.items()]
+        linhas = self._cabecalho()
+        for chave, serie in valores:
+            acumulado = 0.0
+            for limite, contagem in zip(self.buckets, serie):
+                acumulado += contagem
+                rotulo_le = f'le="{_formatar_valor(limite)}"'
+                linhas.append(f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, chave, rotulo_le)} {_formatar_valor(acumulado)}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_valor(serie[-1])}")
+            linhas.append(f"{self.nome}_count{rotulos} {_formatar_valor(acumulado)}")
+        return linhas
+
+
+class Coletada(_Metrica):
+    """Métrica lida na hora da exportação (estatísticas de cache, pool de conexões)."""
+
+    def __init__(self, nome: str, ajuda: str, tipo: str, rotulos: Sequence[str],
+                 coletar: Callable[[], Iterable[Tuple[Sequence[str], float]]]):
+        super().__init__(nome, ajuda, rotulos)
+        self.tipo = tipo
+        self.coletar = coletar
+
+    def exportar(self) -> List[str]:
+        linhas = self._cabecalho()
+        for valores, valor in self.coletar():
+            if valor is None:
+                continue
+            linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {_formatar_valor(valor)}")
+        return linhas
+
+
+class Registro:
+    """Conjunto de métricas do processo, exportado no formato texto do Prometheus."""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        # Reimportar um módulo não duplica a métrica: a nova substitui a anterior
+        with self._trava:
+            self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def exportar(self) -> str:
+        with self._trava:
+            metricas = list(self._metricas.values())
+        linhas: List[str] = []
+        for metrica in metricas:
+            try:
+                linhas.extend(metrica.exportar())
+            except Exception:
+                # Uma métrica coletada com erro não deve derrubar o /metrics
+                continue
+        return "\n".join(linhas) + "\n"
+
+
+registro = Registro()
+
+requisicoes_http = registro.registrar(Contador(
+    "http_requisicoes_total", "Requisições HTTP por rota, método e status.", ("rota", "metodo", "status")
+))
+duracao_http = registro.registrar(Histograma(
+    "http_requisicao_segundos", "Latência das requisições HTTP por rota.", ("rota", "metodo")
+))
+consultas_banco = registro.registrar(Contador(
+    "db_consultas_total", "Comandos SQL executados, por tipo (SELECT, INSERT...).", ("operacao",)
+))
+duracao_banco = registro.registrar(Histograma(
+    "db_consulta_segundos", "Duração dos comandos SQL, por tipo.", ("operacao",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+))
+etapas_llm = registro.registrar(Histograma(
+    "llm_etapa_segundos", "Duração de cada etapa do chat: fetch, retrieve, format, generate.", ("etapa",)
+))
+carga_csv_segundos = registro.registrar(Medidor(
+    "csv_carga_segundos", "Duração da última carga do CSV, por origem.", ("origem",)
+))
+carga_csv_linhas = registro.registrar(Medidor(
+    "csv_carga_linhas", "Linhas lidas na última carga do CSV, por origem.", ("origem",)
+))
+
+
+def _operacao(sql: str) -> str:
+    partes = sql.lstrip().split(None, 1)
+    return partes[0].upper() if partes else "OUTRO"
+
+
+def _antes_de_executar(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+def _depois_de_executar(conn, cursor, statement, parameters, context, executemany) -> None:
+    inicios = conn.info.get("inicio_consultas")
+    if not inicios:
+        return
+    operacao = _operacao(statement)
+    consultas_banco.inc(operacao=operacao)
+    duracao_banco.observar(time.perf_counter() - inicios.pop(), operacao=operacao)
+
+
+def instrumentar_banco() -> None:
+    """Conta e mede os comandos SQL de todos os engines do processo."""
+    if not event.contains(Engine, "before_cursor_execute", _antes_de_executar):
+        event.listen(Engine, "before_cursor_execute", _antes_de_executar)
+        event.listen(Engine, "after_cursor_execute", _depois_de_executar)
+
+
+def registrar_carga_csv(origem: str, segundos: float, linhas: int) -> None:
+    """Guarda a duração e o número de linhas da última carga de um CSV."""
+    carga_csv_segundos.definir(segundos, origem=origem)
+    carga_csv_linhas.definir(linhas, origem=origem)
@@ -0,0 +1,29 @@
+-- Migração da tabela vendas para bancos PostgreSQL já existentes
+-- (o mesmo que criar_tabelas() em importar_csv.py faz automaticamente)
+
+-- Data da venda como DATE (a coluna data guarda o texto dd/mm/aaaa do CSV)
+ALTER TABLE vendas ADD COLUMN IF NOT EXISTS data_venda DATE;
+UPDATE vendas SET data_venda = to_date(data, 'DD/MM/YYYY')
+WHERE data_venda IS NULL AND data ~ '^[0-9]{2}/[0-9]{2}/[0-9]{4}$';
+
+-- Filtros e GROUP BY do dashboard (modo banco) e filtros por data
+CREATE INDEX IF NOT EXISTS ix_vendas_regiao ON vendas (regiao);
+CREATE INDEX IF NOT EXISTS ix_vendas_estado ON vendas (estado);
+CREATE INDEX IF NOT EXISTS ix_vendas_produto ON vendas (produto);
+CREATE INDEX IF NOT EXISTS ix_vendas_regiao_id ON vendas (regiao, id);
+CREATE INDEX IF NOT EXISTS ix_vendas_data_venda ON vendas (data_venda);
+
+-- Séries agregadas por período (dia, semana, mes) e por regiao, estado ou produto,
+-- atualizadas pela importação; para preenchê-las a partir das vendas já existentes,
+-- use recalcular_series() de series_vendas.py
+CREATE TABLE IF NOT EXISTS vendas_serie (
+    granularidade VARCHAR NOT NULL,
+    dimensao VARCHAR NOT NULL,
+    chave VARCHAR NOT NULL,
+    periodo DATE NOT NULL,
+    vendas INTEGER NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    faturamento FLOAT NOT NULL DEFAULT 0,
+    lucro FLOAT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularidade, dimensao, chave, periodo)
+);
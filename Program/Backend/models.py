@@ -1,12 +1,15 @@
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from sqlmodel import SQLModel, Field
-from datetime import datetime
+from sqlalchemy import Index
+from datetime import date, datetime
 
 class QueryInput(BaseModel):
     """Modelo para input de consulta no assistente de chat."""
     message: str
     api_token: Optional[str] = None
+    # Usado pelo streaming: se informado, a resposta final é salva neste chat
+    chat_id: Optional[int] = None
 
 class LangflowResponse(BaseModel):
     """Modelo para resposta do Langflow."""
@@ -16,18 +19,64 @@ class VendasRegiao(BaseModel):
     """Modelo para dados de vendas de uma região."""
     resumo: Dict[str, Any]
     dados_tabela: List[Dict[str, Any]]
+    total_filtrado: Optional[int] = None
+    proximo_cursor: Optional[int] = None
 
 class MessageInput(BaseModel):
     """Modelo para input de mensagem no chat."""
     content: str
     sender: str
 
+# Vendas importadas do CSV (usadas pelo chat, pelos resumos e pelo dashboard no modo banco)
+class Vendas(SQLModel, table=True):
+    # Paginação do dashboard por região em ordem de id (keyset)
+    __table_args__ = (Index("ix_vendas_regiao_id", "regiao", "id"),)
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    latitude: Optional[float] = Field(default=None)
+    longitude: Optional[float] = Field(default=None)
+    data: Optional[str] = Field(default=None)
+    # A mesma data como DATE (a coluna `data` guarda o texto dd/mm/aaaa do CSV)
+    data_venda: Optional[date] = Field(default=None, index=True)
+    cpf: Optional[str] = Field(default=None)
+    cnpj: Optional[str] = Field(default=None)
+    nome_cliente: str = Field(nullable=False)  # Não pode ser nulo
+    # Indexadas: filtros e GROUP BY do dashboard
+    regiao: Optional[str] = Field(default=None, index=True)
+    estado: Optional[str] = Field(default=None, index=True)
+    produto: Optional[str] = Field(default=None, index=True)
+    quantidade: Optional[int] = Field(default=None)
+    valor_unitario: Optional[float] = Field(default=None)
+    lucro_total: Optional[float] = Field(default=None)
+    estoque_atual: Optional[int] = Field(default=None)
+
+# Totais de vendas por período (dia, semana ou mês) e por região, estado ou produto,
+# mantidos de forma incremental pela importação do CSV (series_vendas.py)
+class VendasSerie(SQLModel, table=True):
+    __tablename__ = "vendas_serie"
+    
+    granularidade: str = Field(primary_key=True)  # "dia", "semana" ou "mes"
+    dimensao: str = Field(primary_key=True)  # "regiao", "estado" ou "produto"
+    chave: str = Field(primary_key=True)  # região (ex.: CentroOeste), estado (BR-XX) ou produto
+    periodo: date = Field(primary_key=True)  # primeiro dia do período (semanas começam na segunda)
+    vendas: int = Field(default=0)
+    quantidade: int = Field(default=0)
+    faturamento: float = Field(default=0.0)
+    lucro: float = Field(default=0.0)
+
 class Chat(SQLModel, table=True):
+    # Listagem de chats ordenada e paginada por updated_at (keyset com desempate pelo id;
+    # o índice é percorrido ao contrário para a ordem decrescente)
+    __table_args__ = (Index("ix_chat_updated_at_id", "updated_at", "id"),)
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
 class Message(SQLModel, table=True):
+    # Histórico de um chat: filtro por chat_id e ordenação/cursores por timestamp
+    __table_args__ = (Index("ix_message_chat_id_timestamp", "chat_id", "timestamp"),)
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     chat_id: int = Field(foreign_key="chat.id")
     content: str
@@ -1,10 +1,10 @@
 from sqlmodel import Session, select
-from sqlalchemy.engine import create_engine
 import requests
 import json
 
 # Importar o modelo Vendas da etapa anterior
-from importar_csv import Vendas, engine
+from models import Vendas
+from banco import engine
 
 def buscar_dados_do_banco():
     """Busca dados do PostgreSQL"""
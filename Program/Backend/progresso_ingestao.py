@@ -0,0 +1,73 @@
+import logging
+import time
+from typing import Dict, Any, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from metricas import registrar_carga_csv
+
+logger = logging.getLogger(__name__)
+
+
+def memoria_pico_mb() -> Optional[float]:
+    """Pico de memória residente (RSS) do processo em MB, quando o sistema informa."""
+    if resource is None:
+        return None
+    # ru_maxrss é informado em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ProgressoIngestao:
+    """Acompanha a leitura de um CSV em lotes e registra no log o progresso e a vazão de cada lote."""
+
+    def __init__(self, rotulo: str, tamanho_arquivo: int):
+        self.rotulo = rotulo
+        self.tamanho_arquivo = tamanho_arquivo
+        self.lotes = 0
+        self.linhas = 0
+        self.rejeitadas = 0
+        self.inicio = time.perf_counter()
+        self._inicio_lote = self.inicio
+
+    def registrar_lote(self, linhas: int, posicao_bytes: int, rejeitadas: int = 0) -> Dict[str, Any]:
+        """Registra um lote concluído e envia suas métricas ao log."""
+        agora = time.perf_counter()
+        duracao = agora - self._inicio_lote
+        self._inicio_lote = agora
+        self.lotes += 1
+        self.linhas += linhas
+        self.rejeitadas += rejeitadas
+
+        metricas = {
+            "lote": self.lotes,
+            "linhas": linhas,
+            "rejeitadas": rejeitadas,
+            "linhas_por_segundo": linhas / duracao if duracao else 0.0,
+            "total_linhas": self.linhas,
+            "progresso": min(posicao_bytes / self.tamanho_arquivo, 1.0) if self.tamanho_arquivo else 1.0,
+            "memoria_pico_mb": memoria_pico_mb(),
+        }
+        logger.info("Lote de ingestão concluído", extra={"origem": self.rotulo, **metricas})
+        return metricas
+
+    def resumo(self) -> Dict[str, Any]:
+        """Totais da ingestão até agora."""
+        segundos = time.perf_counter() - self.inicio
+        return {
+            "lotes": self.lotes,
+            "linhas": self.linhas,
+            "rejeitadas": self.rejeitadas,
+            "segundos": segundos,
+            "linhas_por_segundo": self.linhas / segundos if segundos else 0.0,
+            "memoria_pico_mb": memoria_pico_mb(),
+        }
+
+    def concluir(self) -> Dict[str, Any]:
+        """Encerra a ingestão: publica duração e linhas em /metrics e retorna o resumo."""
+        resumo = self.resumo()
+        registrar_carga_csv(self.rotulo, resumo["segundos"], resumo["linhas"])
+        logger.info("Ingestão concluída", extra={"origem": self.rotulo, **resumo})
+        return resumo
@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from metricas import registro, Medidor
+
+logger = logging.getLogger(__name__)
+
+# Momento da importação deste módulo: referência para o tempo até a aplicação ficar pronta
+INICIO_PROCESSO = time.perf_counter()
+
+aquecimento_segundos = registro.registrar(Medidor(
+    "aquecimento_segundos", "Duração do aquecimento de cada subsistema na inicialização.", ("subsistema",)
+))
+tempo_ate_pronto = registro.registrar(Medidor(
+    "inicializacao_ate_pronto_segundos", "Tempo entre a importação da aplicação e todos os subsistemas prontos.", ()
+))
+
+
+class Prontidao:
+    """
+    Estado de inicialização dos subsistemas pesados (DataStore, índice vetorial, banco).
+
+    Cada subsistema é registrado com a função que o aquece e, opcionalmente, uma que diz
+    se ele já foi carregado por outro caminho (sob demanda, na primeira requisição).
+    `aquecer_todos` roda em segundo plano no lifespan da aplicação, depois que o servidor
+    já aceita conexões.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._aquecer: Dict[str, Callable[[], Any]] = {}
+        self._carregado: Dict[str, Optional[Callable[[], bool]]] = {}
+        self._estados: Dict[str, Dict[str, Any]] = {}
+        self.segundos_ate_pronto: Optional[float] = None
+
+    def registrar(self, nome: str, aquecer: Callable[[], Any], carregado: Optional[Callable[[], bool]] = None) -> None:
+        with self._trava:
+            self._aquecer[nome] = aquecer
+            self._carregado[nome] = carregado
+            self._estados[nome] = {"estado": "pendente"}
+
+    def aquecer(self, nome: str) -> None:
+        """Inicializa um subsistema, registrando a duração ou o erro."""
+        with self._trava:
+            self._estados[nome] = {"estado": "aquecendo"}
+        inicio = time.perf_counter()
+        try:
+            self._aquecer[nome]()
+        except Exception as e:
+            logger.exception("Falha ao aquecer subsistema", extra={"subsistema": nome})
+            with self._trava:
+                self._estados[nome] = {"estado": "erro", "erro": str(e)}
+            return
+        segundos = time.perf_counter() - inicio
+        aquecimento_segundos.definir(segundos, subsistema=nome)
+        logger.info("Subsistema pronto", extra={"subsistema": nome, "segundos": segundos})
+        with self._trava:
+            self._estados[nome] = {"estado": "pronto", "segundos": segundos}
+
+    def aquecer_todos(self) -> None:
+        """Aquece todos os subsistemas registrados, um de cada vez."""
+        for nome in list(self._aquecer):
+            self.aquecer(nome)
+        if self.pronto():
+            self.segundos_ate_pronto = time.perf_counter() - INICIO_PROCESSO
+            tempo_ate_pronto.definir(self.segundos_ate_pronto)
+
+    def _estado(self, nome: str) -> Dict[str, Any]:
+        estado = dict(self._estados[nome])
+        carregado = self._carregado[nome]
+        if estado["estado"] == "pendente" and carregado is not None and carregado():
+            estado = {"estado": "pronto", "sob_demanda": True}
+        return estado
+
+    def pronto(self) -> bool:
+        with self._trava:
+            return all(self._estado(nome)["estado"] == "pronto" for nome in self._estados)
+
+    def resumo(self) -> Dict[str, Any]:
+        """Estado de cada subsistema e se a aplicação inteira está pronta."""
+        with self._trava:
+            subsistemas = {nome: self._estado(nome) for nome in self._estados}
+        return {
+            "pronto": all(estado["estado"] == "pronto" for estado in subsistemas.values()),
+            "segundos_ate_pronto": self.segundos_ate_pronto,
+            "subsistemas": subsistemas,
+        }
+
+
+prontidao = Prontidao()
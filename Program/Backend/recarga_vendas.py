@@ -0,0 +1,94 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from data_store import DataStore, obter_data_store, definir_data_store, data_store_carregado
+from metricas import registro, registrar_carga_csv, Contador, Medidor
+
+logger = logging.getLogger(__name__)
+
+recargas_data_store = registro.registrar(Contador(
+    "datastore_recargas_total", "Novas versões do DataStore publicadas, por tipo (incremental ou completa).", ("tipo",)
+))
+versao_data_store = registro.registrar(Medidor(
+    "datastore_versao", "Versão dos dados de vendas em uso no processo.", ()
+))
+
+
+class RecargaVendas:
+    """
+    Recarga do DataStore sem reiniciar os workers.
+
+    Uma thread verifica o CSV a cada `intervalo` segundos. Se só houve linhas acrescentadas
+    no fim do arquivo, lê apenas elas numa cópia do DataStore (copy-on-write); se o arquivo
+    foi truncado ou reescrito, carrega um DataStore novo. Em ambos os casos a nova versão é
+    montada por inteiro (colunas, agregados e índices) e só então publicada, com uma única
+    atribuição: cada requisição pega o DataStore uma vez e trabalha com uma versão consistente.
+    """
+
+    def __init__(self, intervalo: float = 5.0):
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if self._thread is None:
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="recarga-vendas", daemon=True)
+            self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:
+                logger.warning("Erro ao verificar o CSV do DataStore", extra={"erro": str(e)})
+
+    def verificar(self) -> Optional[str]:
+        """
+        Verifica o CSV uma vez e publica a nova versão, se houver.
+        Retorna o tipo de recarga ('incremental' ou 'completa') ou None se nada mudou.
+        """
+        # Enquanto o DataStore não foi carregado, a primeira carga já lerá o arquivo atual
+        if not data_store_carregado():
+            return None
+        atual = obter_data_store()
+        estado = atual.estado_csv()
+        if estado == "inalterado":
+            return None
+
+        inicio = time.perf_counter()
+        if estado == "acrescentado":
+            novo, linhas = atual.com_linhas_acrescentadas()
+            if novo is atual:
+                return None
+            tipo = "incremental"
+        else:
+            novo = DataStore(atual.csv_path, diretorio_snapshot=atual.diretorio_snapshot)
+            novo.versao = atual.versao + 1
+            linhas = sum(len(colunas["id"]) for colunas in novo.colunas_por_regiao.values())
+            tipo = "completa"
+        definir_data_store(novo)
+        segundos = time.perf_counter() - inicio
+
+        recargas_data_store.inc(tipo=tipo)
+        versao_data_store.definir(novo.versao)
+        registrar_carga_csv(f"DataStore_recarga_{tipo}", segundos, linhas)
+        logger.info("Nova versão do DataStore publicada", extra={
+            "tipo": tipo, "versao": novo.versao, "linhas": linhas, "segundos": segundos
+        })
+
+        # O snapshot passa a cobrir o que foi lido (até posicao_csv) para a próxima inicialização;
+        # só é gravado quando a leitura alcançou o fim do arquivo, para não regravá-lo a cada
+        # lote durante uma escrita longa (a carga completa já grava o seu)
+        if tipo == "incremental" and novo.posicao_csv == os.path.getsize(novo.csv_path):
+            novo.salvar_snapshot()
+        return tipo
@@ -0,0 +1,178 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Callable
+
+import orjson
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # sem o pacote brotli, só gzip
+    brotli = None
+
+from metricas import registro, Contador
+
+# Corpos menores que isso vão sem compressão (o cabeçalho do gzip não compensa)
+TAMANHO_MINIMO_COMPRESSAO = 1024
+
+respostas_vendas = registro.registrar(Contador(
+    "vendas_respostas_total",
+    "Respostas de dados de vendas por origem: cache, serializadas de novo ou 304 (nao_modificado).",
+    ("resultado",)
+))
+
+
+def serializar(dados: Any) -> bytes:
+    """JSON compacto em UTF-8 (orjson: floats e escalares do NumPy sem passar pelo pydantic)."""
+    return orjson.dumps(dados, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def escolher_codificacao(accept_encoding: Optional[str]) -> Optional[str]:
+    """Codificação a usar segundo o Accept-Encoding do cliente: 'br', 'gzip' ou None."""
+    aceitas = {}
+    for item in (accept_encoding or "").split(","):
+        nome, _, parametros = item.strip().partition(";")
+        peso = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                peso = float(parametro[2:])
+            except ValueError:
+                peso = 0.0
+        aceitas[nome.strip().lower()] = peso
+    candidatas = ("br", "gzip") if brotli is not None else ("gzip",)
+    for codificacao in candidatas:
+        if aceitas.get(codificacao, aceitas.get("*", 0.0)) > 0:
+            return codificacao
+    return None
+
+
+class RespostaSerializada:
+    """Corpo JSON de uma resposta, seu ETag e as versões comprimidas (calculadas no primeiro pedido)."""
+
+    def __init__(self, corpo: bytes, cache: Optional["CacheRespostasVendas"] = None):
+        self.corpo = corpo
+        # ETag fraco: vale para o corpo em qualquer codificação; vem do conteúdo, então
+        # workers diferentes com os mesmos dados respondem com o mesmo ETag
+        self.etag = f'W/"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"'
+        self._comprimidos: Dict[str, bytes] = {}
+        # Cache que guarda esta resposta: as versões comprimidas entram pela trava dele
+        self._cache = cache
+        # Está no cache agora (e conta no total de bytes dele)?
+        self.guardada = False
+
+    @property
+    def tamanho(self) -> int:
+        return len(self.corpo) + sum(len(comprimido) for comprimido in self._comprimidos.values())
+
+    def comprimido(self, codificacao: str) -> bytes:
+        comprimido = self._comprimidos.get(codificacao)
+        if comprimido is None:
+            if codificacao == "br":
+                comprimido = brotli.compress(self.corpo, quality=5)
+            else:
+                comprimido = gzip.compress(self.corpo, compresslevel=6, mtime=0)
+            # A compressão roda fora da trava; só a inclusão (e a expulsão que ela causar) passa por ela
+            if self._cache is not None:
+                self._cache.guardar_comprimido(self, codificacao, comprimido)
+            else:
+                self._comprimidos[codificacao] = comprimido
+        return comprimido
+
+    def corresponde(self, if_none_match: Optional[str]) -> bool:
+        """If-None-Match do cliente inclui o ETag (comparação fraca, como pede o HTTP)?"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        etag = self.etag[2:]
+        return any(
+            candidato.strip().removeprefix("W/") == etag
+            for candidato in if_none_match.split(",")
+        )
+
+    def responder(self, if_none_match: Optional[str] = None, accept_encoding: Optional[str] = None) -> Response:
+        """304 se o cliente já tem esta versão; senão o JSON, comprimido se o cliente aceitar."""
+        cabecalhos = {"ETag": self.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if self.corresponde(if_none_match):
+            respostas_vendas.inc(resultado="nao_modificado")
+            return Response(status_code=304, headers=cabecalhos)
+        corpo = self.corpo
+        codificacao = escolher_codificacao(accept_encoding) if len(corpo) >= TAMANHO_MINIMO_COMPRESSAO else None
+        if codificacao is not None:
+            corpo = self.comprimido(codificacao)
+            cabecalhos["Content-Encoding"] = codificacao
+        return Response(corpo, media_type="application/json", headers=cabecalhos)
+
+
+class CacheRespostasVendas:
+    """
+    Respostas de vendas já serializadas, com expulsão LRU.
+
+    A chave inclui a versão dos dados (a do DataStore, ou a da tabela Vendas no modo banco)
+    e os parâmetros da consulta: quando os dados mudam, as entradas antigas deixam de ser
+    usadas e saem pelo LRU. O total de bytes guardados (JSON e versões comprimidas) fica
+    abaixo de `max_bytes`: a expulsão roda a cada resposta guardada e a cada versão
+    comprimida acrescentada; respostas maiores que isso não são guardadas. As rotas
+    síncronas rodam no pool de threads, por isso a trava.
+    """
+
+    def __init__(self, max_itens: int = 128, max_bytes: int = 256 * 1024 * 1024):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._itens: "OrderedDict[Tuple, RespostaSerializada]" = OrderedDict()
+        # Bytes das respostas guardadas, com as versões comprimidas
+        self.bytes = 0
+        self._trava = threading.Lock()
+
+    def obter(self, chave: Tuple, calcular: Callable[[], Any]) -> RespostaSerializada:
+        """Resposta em cache para a chave, ou serializa o resultado de calcular() e guarda."""
+        with self._trava:
+            resposta = self._itens.get(chave)
+            if resposta is not None:
+                self._itens.move_to_end(chave)
+        if resposta is not None:
+            respostas_vendas.inc(resultado="cache")
+            return resposta
+
+        resposta = RespostaSerializada(serializar(calcular()), self)
+        respostas_vendas.inc(resultado="serializada")
+        if self.max_itens > 0 and len(resposta.corpo) <= self.max_bytes:
+            with self._trava:
+                anterior = self._itens.pop(chave, None)
+                if anterior is not None:
+                    self._descartar(anterior)
+                self._itens[chave] = resposta
+                resposta.guardada = True
+                self.bytes += resposta.tamanho
+                self._expulsar()
+        return resposta
+
+    def guardar_comprimido(self, resposta: RespostaSerializada, codificacao: str, comprimido: bytes) -> None:
+        """Acrescenta uma versão comprimida à resposta e expulsa as mais antigas se o limite estourar."""
+        with self._trava:
+            if codificacao in resposta._comprimidos:
+                return
+            resposta._comprimidos[codificacao] = comprimido
+            # Uma resposta já expulsa (ainda em uso por alguma requisição) não conta mais
+            if resposta.guardada:
+                self.bytes += len(comprimido)
+                self._expulsar()
+
+    def _descartar(self, resposta: RespostaSerializada) -> None:
+        resposta.guardada = False
+        self.bytes -= resposta.tamanho
+
+    def _expulsar(self) -> None:
+        while self._itens and (len(self._itens) > self.max_itens or self.bytes > self.max_bytes):
+            _, antiga = self._itens.popitem(last=False)
+            self._descartar(antiga)
+
+    def limpar(self) -> None:
+        with self._trava:
+            for resposta in self._itens.values():
+                resposta.guardada = False
+            self._itens.clear()
+            self.bytes = 0
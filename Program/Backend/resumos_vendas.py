@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from data_store import NOME_ESTADO, codigo_estado
+from models import Vendas
+
+logger = logging.getLogger(__name__)
+
+# Colunas de cada linha dos resumos
+CABECALHO_RESUMO = "vendas;qtd;faturamento;lucro"
+
+
+def _chave_mes(mes: str) -> Tuple[int, int]:
+    """Ordena 'mm/aaaa' cronologicamente (valores fora do formato vão para o fim)."""
+    try:
+        numero, ano = mes.split('/')
+        return int(ano), int(numero)
+    except (AttributeError, ValueError):
+        return 9999, 99
+
+
+class ResumosVendas:
+    """
+    Totais da tabela Vendas por região, estado, produto e mês, para o contexto do chat.
+
+    Calculados com GROUP BY no banco e guardados já formatados; só são recalculados
+    quando a versão dos dados muda (novas vendas indexadas) ou após `ttl` segundos.
+    """
+
+    def __init__(self, ttl: float = 600.0):
+        self.ttl = ttl
+        self.texto = ""
+        self.versao: Optional[int] = None
+        self._calculado_em = 0.0
+        self._trava = threading.Lock()
+
+    def _agrupar(self, session: Session, chave) -> List[Tuple]:
+        consulta = select(
+            chave,
+            func.count(Vendas.id),
+            func.sum(Vendas.quantidade),
+            func.sum(Vendas.quantidade * Vendas.valor_unitario),
+            func.sum(Vendas.lucro_total)
+        ).group_by(chave)
+        return list(session.exec(consulta).all())
+
+    def _agrupar_estados(self, session: Session) -> List[Tuple]:
+        """Totais por estado, com as grafias do mesmo estado (com ou sem acentos) somadas."""
+        por_estado: Dict[Optional[str], List] = {}
+        for nome, *totais in self._agrupar(session, Vendas.estado):
+            codigo = codigo_estado(nome) if nome else None
+            rotulo = NOME_ESTADO[codigo] if codigo else nome
+            acumulado = por_estado.setdefault(rotulo, [0, 0, 0.0, 0.0])
+            for posicao, valor in enumerate(totais):
+                acumulado[posicao] += valor or 0
+        return [(rotulo, *totais) for rotulo, totais in por_estado.items()]
+
+    def _mes(self, session: Session):
+        """Expressão 'mm/aaaa' da coluna data_venda no dialeto do banco."""
+        if session.get_bind().dialect.name == "postgresql":
+            return func.to_char(Vendas.data_venda, 'MM/YYYY')
+        return func.strftime('%m/%Y', Vendas.data_venda)
+
+    def _formatar(self, titulo: str, linhas: List[Tuple]) -> str:
+        corpo = "\n".join(
+            f"{nome or 'Não informado'};{vendas};{quantidade or 0};{faturamento or 0:.0f};{lucro or 0:.0f}"
+            for nome, vendas, quantidade, faturamento, lucro in linhas
+        )
+        return f"{titulo} ({CABECALHO_RESUMO}):\n{corpo}"
+
+    def calcular(self, session: Session) -> str:
+        """Recalcula os totais a partir da tabela Vendas e retorna o texto formatado."""
+        por_lucro = lambda linha: -(linha[4] or 0)
+        blocos = [
+            self._formatar("Totais por região", sorted(self._agrupar(session, Vendas.regiao), key=por_lucro)),
+            self._formatar("Totais por estado", sorted(self._agrupar_estados(session), key=por_lucro)),
+            self._formatar("Totais por produto", sorted(self._agrupar(session, Vendas.produto), key=por_lucro)),
+            self._formatar(
+                "Totais por mês (mm/aaaa)",
+                sorted(self._agrupar(session, self._mes(session)), key=lambda linha: _chave_mes(linha[0]))
+            ),
+        ]
+        return "\n\n".join(blocos)
+
+    def obter(self, session: Session, versao: int) -> str:
+        """Retorna os resumos, recalculando-os se os dados mudaram ou se expiraram."""
+        with self._trava:
+            expirado = time.monotonic() - self._calculado_em > self.ttl
+            if versao != self.versao or expirado:
+                inicio = time.perf_counter()
+                self.texto = self.calcular(session)
+                self.versao = versao
+                self._calculado_em = time.monotonic()
+                logger.info(
+                    "Resumos de vendas recalculados",
+                    extra={"versao": versao, "tempo_ms": (time.perf_counter() - inicio) * 1000}
+                )
+            return self.texto
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from typing import List, Dict, Any, Optional
+from datetime import datetime
 
 from models import QueryInput, LangflowResponse, VendasRegiao, Chat, Message, MessageInput
+from sqlmodel import Session
+
 from services import llama_service, vendas_service, chat_service
+from banco import obter_sessao, estatisticas_pool
+from metricas import registro, TIPO_CONTEUDO
+from prontidao import prontidao
 
 # Criar os roteadores para cada grupo de endpoints
 chat_router = APIRouter(prefix="/api", tags=["chat"])
 vendas_router = APIRouter(prefix="/api/vendas", tags=["vendas"])
+sistema_router = APIRouter(prefix="/api/sistema", tags=["sistema"])
+metricas_router = APIRouter(tags=["sistema"])
 
 @chat_router.post("/query", response_model=LangflowResponse)
 async def query_llama(query_input: QueryInput):
@@ -14,43 +23,149 @@ async def query_llama(query_input: QueryInput):
     response = await llama_service.query(query_input.message)
     return LangflowResponse(response=response)
 
+@chat_router.post("/query/stream")
+async def query_llama_stream(query_input: QueryInput):
+    """Envia uma consulta ao assistente e devolve a resposta em streaming (NDJSON, um token por linha)."""
+    return StreamingResponse(
+        llama_service.query_stream(query_input.message, query_input.chat_id),
+        media_type="application/x-ndjson"
+    )
+
+@chat_router.get("/query/cache", response_model=Dict[str, Any])
+async def estatisticas_cache():
+    """Retorna os contadores do cache de respostas do chat (acertos, falhas, taxa de acerto)."""
+    return llama_service.cache.estatisticas()
+
 # Rotas para gerenciamento de chats
+# (funções síncronas: o FastAPI as executa no pool de threads, sem bloquear o event loop)
 @chat_router.post("/chats", response_model=Dict[str, int])
-async def criar_chat():
+def criar_chat(session: Session = Depends(obter_sessao)):
     """Cria um novo chat e retorna seu ID."""
-    chat_id = chat_service.criar_chat()
+    chat_id = chat_service.criar_chat(session)
     return {"chat_id": chat_id}
 
 @chat_router.post("/chats/{chat_id}/messages")
-async def salvar_mensagem(chat_id: int, message_input: MessageInput):
+def salvar_mensagem(chat_id: int, message_input: MessageInput, session: Session = Depends(obter_sessao)):
     """Salva uma nova mensagem no chat especificado."""
-    chat_service.salvar_mensagem(chat_id, message_input.content, message_input.sender)
+    chat_service.salvar_mensagem(session, chat_id, message_input.content, message_input.sender)
     return {"status": "success"}
 
 @chat_router.delete("/chats/{chat_id}")
-async def excluir_chat(chat_id: int):
+def excluir_chat(chat_id: int, session: Session = Depends(obter_sessao)):
     """Exclui um chat específico."""
-    if not chat_service.excluir_chat(chat_id):
+    if not chat_service.excluir_chat(session, chat_id):
         raise HTTPException(status_code=404, detail="Chat não encontrado")
     return {"status": "success"}
 
 @chat_router.get("/chats", response_model=List[Dict[str, Any]])
-async def listar_chats():
-    """Lista todos os chats disponíveis."""
-    return chat_service.listar_chats()
+def listar_chats(
+    limite: Optional[int] = Query(None, ge=1, le=500, description="Tamanho da página (sem limite, retorna todos)"),
+    antes: Optional[datetime] = Query(None, description="updated_at do último chat da página anterior"),
+    antes_id: Optional[int] = Query(None, description="id do último chat da página anterior"),
+    session: Session = Depends(obter_sessao)
+):
+    """Lista os chats disponíveis, do mais recente para o mais antigo."""
+    return chat_service.listar_chats(session, limite, antes, antes_id)
 
 @chat_router.get("/chats/{chat_id}/messages", response_model=List[Dict[str, Any]])
-async def obter_mensagens_chat(chat_id: int):
-    """Obtém todas as mensagens de um chat específico."""
-    return chat_service.obter_mensagens_chat(chat_id)
+def obter_mensagens_chat(
+    chat_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Máximo de mensagens (sem limite, retorna todas)"),
+    before: Optional[int] = Query(None, description="ID de mensagem: retorna as anteriores a ela"),
+    after: Optional[int] = Query(None, description="ID de mensagem: retorna as posteriores a ela"),
+    session: Session = Depends(obter_sessao)
+):
+    """Obtém as mensagens de um chat específico, em ordem cronológica."""
+    return chat_service.obter_mensagens_chat(session, chat_id, limit, before, after)
 
+# Rotas de vendas síncronas: no modo banco as consultas bloqueiam, então rodam no pool de threads
 @vendas_router.get("/regioes")
-async def listar_regioes():
+def listar_regioes():
     """Retorna a lista de regiões disponíveis."""
     regioes = vendas_service.listar_regioes()
     return {"regioes": regioes}
 
 @vendas_router.get("/dados/{regiao}", response_model=VendasRegiao)
-async def dados_vendas_por_regiao(regiao: str):
-    """Retorna dados de vendas para uma região específica."""
-    return vendas_service.obter_dados_vendas_regiao(regiao) 
\ No newline at end of file
+def dados_vendas_por_regiao(
+    regiao: str,
+    estado: Optional[str] = None,
+    produto: Optional[str] = None,
+    cliente: Optional[str] = None,
+    data_inicio: Optional[str] = Query(None, description="Data inicial (AAAA-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data final (AAAA-MM-DD)"),
+    ordenar: str = Query("ID", description="Campo de ordenação (ex.: ID, Data, Valor, Cliente)"),
+    ordem: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[int] = Query(None, description="proximo_cursor retornado pela página anterior"),
+    limite: Optional[int] = Query(None, ge=1, le=10000, description="Tamanho da página (sem limite, retorna tudo)"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Retorna dados de vendas para uma região específica, com filtros e paginação opcionais.
+    Responde com ETag (304 se If-None-Match já for a versão atual) e gzip/brotli conforme o Accept-Encoding.
+    """
+    campos = [campo.strip() for campo in fields.split(",") if campo.strip()] if fields else None
+    resposta = vendas_service.obter_resposta_regiao(
+        regiao, estado=estado, produto=produto, cliente=cliente,
+        data_inicio=data_inicio, data_fim=data_fim, ordenar=ordenar,
+        decrescente=(ordem == "desc"), cursor=cursor, limite=limite, campos=campos
+    )
+    return resposta.responder(if_none_match, accept_encoding)
+
+@vendas_router.get("/resumo/{regiao}/estados", response_model=Dict[str, Dict[str, Any]])
+def resumo_vendas_por_estado(regiao: str):
+    """Retorna o resumo de vendas de cada estado de uma região."""
+    return vendas_service.obter_resumo_estados(regiao)
+
+@vendas_router.get("/mapa", response_model=Dict[str, Any])
+def mapa_vendas(
+    zoom: int = Query(4, ge=0, le=24, description="Nível de zoom: células de 360/2^zoom graus"),
+    min_lat: float = Query(-90.0, ge=-90, le=90),
+    min_lon: float = Query(-180.0, ge=-180, le=180),
+    max_lat: float = Query(90.0, ge=-90, le=90),
+    max_lon: float = Query(180.0, ge=-180, le=180),
+    regiao: Optional[str] = Query(None, description="Só as vendas desta região"),
+):
+    """Vendas agregadas por célula (contagem, faturamento, lucro e centróide) dentro do retângulo."""
+    return vendas_service.obter_mapa(zoom, min_lat, min_lon, max_lat, max_lon, regiao)
+
+@vendas_router.get("/serie/{dimensao}", response_model=Dict[str, List[Dict[str, Any]]])
+def series_vendas(
+    dimensao: str,
+    granularidade: str = Query("mes", pattern="^(dia|semana|mes)$"),
+    inicio: Optional[str] = Query(None, description="Primeiro período (AAAA-MM-DD)"),
+    fim: Optional[str] = Query(None, description="Último período (AAAA-MM-DD)"),
+    session: Session = Depends(obter_sessao)
+):
+    """Séries de faturamento e lucro de todas as regiões, estados ou produtos (dimensao)."""
+    return vendas_service.obter_series(session, dimensao, granularidade, inicio=inicio, fim=fim)
+
+@vendas_router.get("/serie/{dimensao}/{chave}", response_model=List[Dict[str, Any]])
+def serie_vendas(
+    dimensao: str,
+    chave: str,
+    granularidade: str = Query("mes", pattern="^(dia|semana|mes)$"),
+    inicio: Optional[str] = Query(None, description="Primeiro período (AAAA-MM-DD)"),
+    fim: Optional[str] = Query(None, description="Último período (AAAA-MM-DD)"),
+    session: Session = Depends(obter_sessao)
+):
+    """Série de uma região (ex.: Sudeste), estado (ex.: BR-SP) ou produto, em ordem de período."""
+    series = vendas_service.obter_series(session, dimensao, granularidade, chave, inicio, fim)
+    return series[chave]
+
+@sistema_router.get("/pool", response_model=Dict[str, Any])
+def estatisticas_pool_banco():
+    """Retorna o estado do pool de conexões do banco (conexões em uso, overflow, tempo de espera)."""
+    return estatisticas_pool()
+
+@sistema_router.get("/prontidao", response_model=Dict[str, Any])
+def estado_prontidao():
+    """Estado de cada subsistema (DataStore, índice vetorial, banco); 503 enquanto algum não estiver pronto."""
+    resumo = prontidao.resumo()
+    return JSONResponse(resumo, status_code=200 if resumo["pronto"] else 503)
+
+@metricas_router.get("/metrics", include_in_schema=False)
+def exportar_metricas():
+    """Métricas da aplicação no formato texto do Prometheus."""
+    return Response(registro.exportar(), media_type=TIPO_CONTEUDO)
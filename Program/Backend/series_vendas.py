@@ -0,0 +1,148 @@
+import logging
+from datetime import date
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from data_store import NOME_CSV_PARA_REGIAO, codigo_estado
+from models import Vendas, VendasSerie
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+GRANULARIDADES = ("dia", "semana", "mes")
+DIMENSOES = ("regiao", "estado", "produto")
+MEDIDAS = ("vendas", "quantidade", "faturamento", "lucro")
+# Colunas da tabela Vendas usadas nas séries
+COLUNAS_SERIE = ("data_venda", "regiao", "estado", "produto", "quantidade", "valor_unitario", "lucro_total")
+
+
+def _chave_estado(nome: Optional[str]) -> Optional[str]:
+    # Nomes com e sem acento caem no mesmo código BR-XX (o usado pelo dashboard)
+    if not isinstance(nome, str):
+        return None
+    return codigo_estado(nome) or nome
+
+
+def agregar_lote(lote: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Totais de um lote de vendas (colunas de COLUNAS_SERIE) por granularidade, dimensão,
+    chave e período: as linhas a somar na tabela de séries. Vendas sem data são ignoradas.
+    """
+    # pandas só é importado pela importação, não pela API (que apenas consulta as séries)
+    import pandas as pd
+
+    lote = lote[lote["data_venda"].notna()]
+    if lote.empty:
+        return pd.DataFrame(columns=["granularidade", "dimensao", "chave", "periodo", *MEDIDAS])
+
+    datas = pd.to_datetime(lote["data_venda"])
+    quantidade = pd.to_numeric(lote["quantidade"]).fillna(0)
+    medidas = pd.DataFrame({
+        "vendas": 1,
+        "quantidade": quantidade.astype("int64"),
+        "faturamento": (quantidade * pd.to_numeric(lote["valor_unitario"]).fillna(0)).astype(float),
+        "lucro": pd.to_numeric(lote["lucro_total"]).fillna(0).astype(float),
+    }, index=lote.index)
+    chaves = {
+        "regiao": lote["regiao"].map(lambda regiao: NOME_CSV_PARA_REGIAO.get(regiao, regiao)),
+        "estado": lote["estado"].map(_chave_estado),
+        "produto": lote["produto"],
+    }
+    periodos = {
+        "dia": datas.dt.normalize(),
+        "semana": (datas - pd.to_timedelta(datas.dt.weekday, unit="D")).dt.normalize(),
+        "mes": datas.dt.to_period("M").dt.start_time,
+    }
+
+    partes = []
+    for granularidade, periodo in periodos.items():
+        for dimensao, chave in chaves.items():
+            grupos = (
+                medidas.assign(chave=chave, periodo=periodo.dt.date)
+                .dropna(subset=["chave"])
+                .groupby(["chave", "periodo"], sort=False)[list(MEDIDAS)]
+                .sum()
+                .reset_index()
+            )
+            partes.append(grupos.assign(granularidade=granularidade, dimensao=dimensao))
+    return pd.concat(partes, ignore_index=True)
+
+
+def acumular_series(conexao, lote: "pd.DataFrame") -> int:
+    """
+    Soma os totais do lote às séries (INSERT ... ON CONFLICT DO UPDATE), na mesma
+    transação da conexão recebida. Retorna quantas linhas de série foram tocadas.
+    """
+    linhas = agregar_lote(lote)
+    if linhas.empty:
+        return 0
+    if conexao.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    tabela = VendasSerie.__table__
+    comando = insert(tabela)
+    comando = comando.on_conflict_do_update(
+        index_elements=[coluna.name for coluna in tabela.primary_key.columns],
+        set_={medida: tabela.c[medida] + comando.excluded[medida] for medida in MEDIDAS}
+    )
+    # Tipos do Python (o driver não adapta os escalares do NumPy)
+    conexao.execute(comando, linhas.astype(object).to_dict("records"))
+    return len(linhas)
+
+
+def recalcular_series(engine, linhas_por_lote: int = 100000) -> None:
+    """Refaz todas as séries a partir da tabela Vendas (bancos importados antes das séries)."""
+    import pandas as pd
+
+    colunas = [getattr(Vendas, nome) for nome in COLUNAS_SERIE]
+    with engine.begin() as conexao:
+        conexao.execute(delete(VendasSerie))
+        for lote in pd.read_sql(select(*colunas), conexao, chunksize=linhas_por_lote):
+            acumular_series(conexao, lote)
+    logger.info("Séries de vendas recalculadas")
+
+
+def series_vazias(engine) -> bool:
+    """A tabela de séries está vazia, mas há vendas (com data) para agregar?"""
+    with Session(engine) as session:
+        if session.exec(select(VendasSerie.chave).limit(1)).first() is not None:
+            return False
+        return session.exec(select(Vendas.id).where(Vendas.data_venda.is_not(None)).limit(1)).first() is not None
+
+
+def consultar_series(
+    session: Session,
+    dimensao: str,
+    granularidade: str,
+    chave: Optional[str] = None,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Pontos das séries da dimensão (só a da chave, se informada), em ordem de período."""
+    condicoes = [VendasSerie.granularidade == granularidade, VendasSerie.dimensao == dimensao]
+    if chave is not None:
+        condicoes.append(VendasSerie.chave == chave)
+    if inicio is not None:
+        condicoes.append(VendasSerie.periodo >= inicio)
+    if fim is not None:
+        condicoes.append(VendasSerie.periodo <= fim)
+    consulta = (
+        select(VendasSerie.chave, VendasSerie.periodo, *(getattr(VendasSerie, medida) for medida in MEDIDAS))
+        .where(*condicoes)
+        .order_by(VendasSerie.chave, VendasSerie.periodo)
+    )
+    series: Dict[str, List[Dict[str, Any]]] = {}
+    for chave_serie, periodo, vendas, quantidade, faturamento, lucro in session.exec(consulta):
+        series.setdefault(chave_serie, []).append({
+            "periodo": periodo.isoformat(),
+            "vendas": vendas,
+            "quantidade": quantidade,
+            "faturamento": faturamento,
+            "lucro": lucro,
+        })
+    return series
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from colunas_vendas import ESQUEMA_COLUNAS, COLUNAS_CATEGORICAS
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato: snapshots de outro formato (ou de outro esquema de colunas) são ignorados
+FORMATO_SNAPSHOT = 1
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+
+def hash_arquivo(caminho: str, tamanho: Optional[int] = None, tamanho_bloco: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo do arquivo (só dos primeiros `tamanho` bytes, se informado), lido em blocos."""
+    resumo = hashlib.sha256()
+    restante = tamanho
+    with open(caminho, 'rb') as arquivo:
+        while restante is None or restante > 0:
+            bloco = arquivo.read(tamanho_bloco if restante is None else min(tamanho_bloco, restante))
+            if not bloco:
+                break
+            resumo.update(bloco)
+            if restante is not None:
+                restante -= len(bloco)
+    return resumo.hexdigest()
+
+
+def _esquema() -> Dict[str, str]:
+    return {nome: np.dtype(dtype).str for nome, (_, dtype) in ESQUEMA_COLUNAS.items()}
+
+
+class SnapshotVendas:
+    """
+    Snapshot binário das colunas do DataStore, para não reprocessar o CSV a cada inicialização.
+
+    Cada coluna é gravada num .npy com as linhas de todas as regiões em sequência; o
+    manifesto guarda os intervalos de cada região, os dicionários das categóricas e a
+    identificação do CSV de origem (mtime, tamanho e SHA-256). Na carga os arrays são
+    abertos com memory-map somente leitura, então vários workers compartilham as mesmas
+    páginas do cache do sistema. O tamanho e o hash são os da parte do CSV que foi
+    carregada: linhas acrescentadas depois continuam fora do snapshot e são lidas pela
+    recarga incremental. Como no índice vetorial, os arquivos levam a versão no
+    nome e o manifesto é trocado por último, de forma atômica.
+    """
+
+    def __init__(self, diretorio: str, csv_path: str):
+        # Um subdiretório por CSV (o mesmo diretório pode servir a vários arquivos)
+        chave = hashlib.sha1(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:16]
+        self.diretorio = os.path.join(diretorio, chave)
+        self.csv_path = csv_path
+        # Manifesto do último snapshot carregado
+        self.manifesto: Optional[Dict[str, Any]] = None
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio, nome)
+
+    def _ler_manifesto(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._caminho(ARQUIVO_MANIFESTO), 'r', encoding='utf-8') as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+
+    def _gravar_manifesto(self, manifesto: Dict[str, Any]) -> None:
+        temporario = self._caminho(f"{ARQUIVO_MANIFESTO}.{os.getpid()}.tmp")
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False)
+        os.replace(temporario, self._caminho(ARQUIVO_MANIFESTO))
+
+    def _valido(self, manifesto: Dict[str, Any]) -> bool:
+        """
+        O snapshot corresponde ao início do CSV atual? mtime e tamanho iguais bastam; senão
+        compara o hash dos primeiros `tamanho` bytes (o arquivo pode ter crescido depois).
+        """
+        if manifesto.get("formato") != FORMATO_SNAPSHOT or manifesto.get("esquema") != _esquema():
+            return False
+        estado = os.stat(self.csv_path)
+        if manifesto["mtime_ns"] == estado.st_mtime_ns and manifesto["tamanho"] == estado.st_size:
+            return True
+        if manifesto["tamanho"] > estado.st_size or manifesto["sha256"] != hash_arquivo(self.csv_path, manifesto["tamanho"]):
+            return False
+        if manifesto["tamanho"] == estado.st_size:
+            # Mesmo conteúdo com outro mtime (ex.: arquivo copiado): atualizar a chave rápida
+            manifesto["mtime_ns"] = estado.st_mtime_ns
+            self._gravar_manifesto(manifesto)
+        return True
+
+    def carregar(self) -> Optional[Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, List[Optional[str]]], int]]:
+        """
+        Abre o snapshot do CSV, se existir e ainda corresponder a ele.
+        Retorna (colunas por região, valores das categóricas, próximo ID) ou None.
+        """
+        manifesto = self._ler_manifesto()
+        if manifesto is None or not self._valido(manifesto):
+            return None
+        versao = manifesto["versao"]
+        arrays = {
+            nome: np.load(self._caminho(f"{nome}-{versao}.npy"), mmap_mode='r')
+            for nome in ESQUEMA_COLUNAS
+        }
+        colunas_por_regiao = {
+            regiao: {nome: array[inicio:fim] for nome, array in arrays.items()}
+            for regiao, (inicio, fim) in manifesto["regioes"].items()
+        }
+        self.manifesto = manifesto
+        return colunas_por_regiao, manifesto["categorias"], manifesto["proximo_id"]
+
+    def salvar(
+        self,
+        colunas_por_regiao: Dict[str, Dict[str, np.ndarray]],
+        categorias: Dict[str, List[Optional[str]]],
+        proximo_id: int,
+        tamanho: int
+    ) -> None:
+        """Grava as colunas e o manifesto; `tamanho` é quantos bytes do CSV foram carregados nelas."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        estado = os.stat(self.csv_path)
+        sha256 = hash_arquivo(self.csv_path, tamanho)
+        versao = sha256[:16]
+        anterior = self._ler_manifesto()
+
+        regioes: Dict[str, List[int]] = {}
+        total = 0
+        for regiao, colunas in colunas_por_regiao.items():
+            regioes[regiao] = [total, total + len(colunas["id"])]
+            total += len(colunas["id"])
+
+        for nome, (_, dtype) in ESQUEMA_COLUNAS.items():
+            # Gravar direto no arquivo, região por região, sem concatenar em memória
+            temporario = self._caminho(f"{nome}-{versao}.{os.getpid()}.tmp.npy")
+            destino = np.lib.format.open_memmap(temporario, mode='w+', dtype=dtype, shape=(total,))
+            for regiao, (inicio, fim) in regioes.items():
+                destino[inicio:fim] = colunas_por_regiao[regiao][nome]
+            destino.flush()
+            del destino
+            os.replace(temporario, self._caminho(f"{nome}-{versao}.npy"))
+
+        self._gravar_manifesto({
+            "formato": FORMATO_SNAPSHOT,
+            "esquema": _esquema(),
+            "csv": os.path.abspath(self.csv_path),
+            # Se o arquivo já cresceu, o mtime não descreve a parte carregada (vale o hash)
+            "mtime_ns": estado.st_mtime_ns if estado.st_size == tamanho else None,
+            "tamanho": tamanho,
+            "sha256": sha256,
+            "versao": versao,
+            "regioes": regioes,
+            "categorias": {nome: categorias[nome] for nome in COLUNAS_CATEGORICAS},
+            "proximo_id": proximo_id,
+        })
+
+        # Arquivos da versão anterior podem ser removidos (quem já os mapeou mantém o acesso)
+        if anterior and anterior.get("versao") not in (None, versao):
+            for nome in ESQUEMA_COLUNAS:
+                antigo = self._caminho(f"{nome}-{anterior['versao']}.npy")
+                if os.path.exists(antigo):
+                    os.remove(antigo)
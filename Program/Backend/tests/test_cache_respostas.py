@@ -0,0 +1,41 @@
+from cache_respostas import CacheRespostas
+
+
+def _cache_com_resposta():
+    cache = CacheRespostas(limiar_similaridade=0.75)
+    cache.guardar("Qual o produto mais vendido no Sul?", "1,2", "Notebook")
+    return cache
+
+
+def test_pergunta_parecida_com_o_mesmo_sentido_usa_o_cache():
+    cache = _cache_com_resposta()
+
+    assert cache.obter("qual é o produto mais vendido da região Sul", "1,2") == "Notebook"
+    assert cache.acertos_similares == 1
+
+
+def test_polaridade_numeros_e_palavras_diferentes_nao_usam_o_cache():
+    cache = _cache_com_resposta()
+
+    for pergunta in (
+        "Qual o produto menos vendido no Sul?",
+        "Qual o produto mais vendido no Norte?",
+        "Qual o produto não vendido no Sul?",
+        "Quais os 5 produtos mais vendidos no Sul?",
+        "Qual o cliente que mais comprou no Sul?",
+    ):
+        assert cache.obter(pergunta, "1,2") is None, pergunta
+
+
+def test_resposta_de_outro_contexto_nao_e_usada():
+    cache = _cache_com_resposta()
+
+    assert cache.obter("qual é o produto mais vendido da região Sul", "3,4") is None
+
+
+def test_sem_limiar_so_a_pergunta_exata_usa_o_cache():
+    cache = CacheRespostas()
+    cache.guardar("Qual o produto mais vendido no Sul?", "1,2", "Notebook")
+
+    assert cache.obter("qual o produto mais vendido no sul", "1,2") == "Notebook"
+    assert cache.obter("qual é o produto mais vendido da região Sul", "1,2") is None
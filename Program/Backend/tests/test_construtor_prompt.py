@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+from construtor_prompt import ConstrutorPrompt
+
+
+def _venda(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        regiao="Sul", estado="Paraná", nome_cliente=f"Cliente {i}", produto="Notebook",
+        quantidade=2, valor_unitario=3500.0, lucro_total=900.0, data="01/02/2025",
+    )
+
+
+def test_resumos_maiores_que_o_orcamento_nao_expulsam_as_vendas():
+    construtor = ConstrutorPrompt(orcamento_tokens=600)
+    resumos = "\n".join(f"Produto {i}: 1234 vendas, lucro 98765.43" for i in range(500))
+    dados = [_venda(i) for i in range(20)]
+
+    prompt = construtor.montar("Qual o produto mais vendido?", dados, resumos)
+
+    assert prompt.tokens <= 600
+    assert prompt.linhas_incluidas > 0
+    assert "(resumo truncado)" in prompt.texto
+    assert "Produto 0:" in prompt.texto
+
+
+def test_resumos_pequenos_entram_inteiros():
+    construtor = ConstrutorPrompt(orcamento_tokens=1500)
+    resumos = "Sul: 10 vendas\nNorte: 5 vendas"
+
+    prompt = construtor.montar("Total por região?", [_venda(1)], resumos)
+
+    assert resumos in prompt.texto
+    assert "(resumo truncado)" not in prompt.texto
+    assert prompt.linhas_incluidas == 1
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from indices_vendas import IndiceGeografico, OrdemColuna
+
+
+def _indice(nivel_maximo: int) -> IndiceGeografico:
+    latitudes = np.array([-23.5, -22.9, -30.0, 90.0])
+    longitudes = np.array([-46.6, -43.2, -51.2, 180.0])
+    valores = np.array([100.0, 200.0, 300.0, 400.0])
+    lucros = np.array([10.0, 20.0, 30.0, 40.0])
+    return IndiceGeografico(latitudes, longitudes, valores, lucros, nivel_maximo=nivel_maximo)
+
+
+def test_nivel_maximo_zero_tem_uma_celula_com_todas_as_vendas():
+    indice = _indice(0)
+
+    nivel, celulas = indice.consultar(0, -90, -180, 90, 180)
+
+    assert nivel == 0
+    assert len(celulas) == 1
+    assert celulas[0]["vendas"] == 4
+    assert celulas[0]["faturamento"] == pytest.approx(1000.0)
+    assert celulas[0]["limites"] == [-90.0, -180.0, 270.0, 180.0]
+
+
+def test_niveis_acima_somam_as_celulas_de_baixo():
+    indice = _indice(6)
+
+    for nivel in range(7):
+        _, celulas = indice.consultar(nivel, -90, -180, 90, 180)
+        assert sum(celula["vendas"] for celula in celulas) == 4
+        assert sum(celula["lucro"] for celula in celulas) == pytest.approx(100.0)
+
+
+def test_ordem_coluna_deixa_os_nulos_no_fim_nos_dois_sentidos():
+    ids = np.array([1, 2, 3, 4, 5])
+    chave = np.array([2.0, np.nan, 1.0, 2.0, np.nan])
+    ordem = OrdemColuna(chave, np.isnan(chave), ids)
+
+    assert ids[ordem.ordens[False]].tolist() == [3, 1, 4, 2, 5]
+    assert ids[ordem.ordens[True]].tolist() == [4, 1, 3, 5, 2]
+    for sentido in (False, True):
+        assert ordem.ordens[sentido][ordem.postos[sentido]].tolist() == list(range(5))
@@ -0,0 +1,325 @@
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+from sqlalchemy import Integer, case, cast, func, or_, and_
+from sqlmodel import Session, select
+
+from agregados_vendas import montar_resumo, LIMITE_ESTOQUE_BAIXO
+from banco import nova_sessao
+from colunas_vendas import CHAVES_LEGADAS, COLUNAS_POR_CHAVE
+from indices_vendas import formatar_celula, tamanho_celula
+from data_store import ESTADOS_POR_REGIAO, REGIAO_PARA_NOME_CSV, codigo_estado
+from models import Vendas
+
+# Linhas trazidas do banco por vez ao percorrer o resultado (cursor do lado do servidor)
+LINHAS_POR_BUSCA = 1000
+
+VALOR = Vendas.quantidade * Vendas.valor_unitario
+DOC_FISCAL = func.coalesce(func.nullif(Vendas.cnpj, ""), Vendas.cpf)
+
+# Coluna do DataStore -> expressão SQL equivalente
+EXPRESSOES = {
+    "id": Vendas.id,
+    "data": Vendas.data_venda,
+    "latitude": Vendas.latitude,
+    "longitude": Vendas.longitude,
+    "doc_fiscal": DOC_FISCAL,
+    "cliente": Vendas.nome_cliente,
+    "regiao": Vendas.regiao,
+    "estado": Vendas.estado,
+    "estado_nome": Vendas.estado,
+    "produto": Vendas.produto,
+    "quantidade": Vendas.quantidade,
+    "estoque_atual": Vendas.estoque_atual,
+    "valor_unitario": Vendas.valor_unitario,
+    "valor": VALOR,
+    "lucro": Vendas.lucro_total,
+}
+
+
+def ler_data_iso(valor: Optional[str]) -> Optional[date]:
+    """Converte AAAA-MM-DD (vazio: None); lança ValueError com a mensagem usada pela API."""
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError("Data inválida: use o formato AAAA-MM-DD")
+
+
+class VendasBanco:
+    """
+    Dados do dashboard calculados direto na tabela Vendas (a mesma usada pelo chat).
+
+    Resumos e estoque saem de GROUP BY sobre as colunas indexadas regiao, estado e produto;
+    as linhas da tabela são lidas com cursor do lado do servidor, em blocos de
+    LINHAS_POR_BUSCA. Os resultados agregados ficam numa cache em memória por `ttl`
+    segundos (0 desliga). Os métodos retornam o mesmo formato que os do DataStore.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._trava = threading.Lock()
+
+    def _em_cache(self, chave: Tuple, calcular: Callable[[], Any]) -> Any:
+        if self.ttl <= 0:
+            return calcular()
+        agora = time.monotonic()
+        with self._trava:
+            guardado = self._cache.get(chave)
+        if guardado is not None and agora - guardado[0] < self.ttl:
+            return guardado[1]
+        valor = calcular()
+        with self._trava:
+            self._cache[chave] = (agora, valor)
+        return valor
+
+    def limpar_cache(self) -> None:
+        with self._trava:
+            self._cache.clear()
+
+    def _agregar(self, session: Session, condicao, agrupar=None) -> List[Tuple]:
+        """Totais das vendas que atendem à condição: (grupo?, vendas, faturamento, qtd, lucro, clientes, estoque, baixo)."""
+        colunas = [
+            func.count(Vendas.id),
+            func.coalesce(func.sum(VALOR), 0),
+            func.coalesce(func.sum(Vendas.quantidade), 0),
+            func.coalesce(func.sum(Vendas.lucro_total), 0),
+            func.count(func.distinct(Vendas.nome_cliente)),
+            func.coalesce(func.sum(Vendas.estoque_atual), 0),
+            func.coalesce(func.sum(case((Vendas.estoque_atual < LIMITE_ESTOQUE_BAIXO, 1), else_=0)), 0),
+        ]
+        if agrupar is None:
+            return list(session.exec(select(*colunas).where(condicao)).all())
+        return list(session.exec(select(agrupar, *colunas).where(condicao).group_by(agrupar)).all())
+
+    @staticmethod
+    def _resumo(linha: Tuple) -> Dict[str, Any]:
+        vendas, faturamento, quantidade, lucro, clientes, estoque, baixo = linha
+        return montar_resumo(vendas, faturamento, quantidade, lucro, clientes, estoque, baixo)
+
+    def _nomes_estados(self, session: Session) -> Dict[str, List[str]]:
+        """Código do estado (BR-XX) -> nomes como aparecem na tabela (com ou sem acentos)."""
+        def calcular():
+            nomes: Dict[str, List[str]] = {}
+            for nome in session.exec(select(Vendas.estado).distinct()).all():
+                codigo = codigo_estado(nome) if nome else None
+                if codigo:
+                    nomes.setdefault(codigo, []).append(nome)
+            return nomes
+        return self._em_cache(("nomes_estados",), calcular)
+
+    def versao(self) -> Tuple[int, int]:
+        """Versão dos dados da tabela Vendas (número de vendas e maior ID; a importação só acrescenta)."""
+        def calcular():
+            with nova_sessao() as session:
+                total, maior_id = session.exec(select(func.count(Vendas.id), func.max(Vendas.id))).one()
+            return total, maior_id or 0
+        return self._em_cache(("versao",), calcular)
+
+    def resumo_regiao(self, regiao: str) -> Optional[Dict[str, Any]]:
+        """Resumo da região, ou None se ela não tiver vendas."""
+        def calcular():
+            with nova_sessao() as session:
+                linha = self._agregar(session, Vendas.regiao == REGIAO_PARA_NOME_CSV[regiao])[0]
+            return self._resumo(linha) if linha[0] else None
+        return self._em_cache(("resumo", regiao), calcular)
+
+    def resumo_estados(self, regiao: str) -> Dict[str, Dict[str, Any]]:
+        """Resumo de cada estado da região que tem vendas."""
+        def calcular():
+            with nova_sessao() as session:
+                nomes = self._nomes_estados(session)
+                codigo_por_nome = {
+                    nome: codigo for codigo in ESTADOS_POR_REGIAO[regiao] for nome in nomes.get(codigo, [])
+                }
+                if not codigo_por_nome:
+                    return {}
+                linhas = self._agregar(session, Vendas.estado.in_(list(codigo_por_nome)), agrupar=Vendas.estado)
+                por_codigo: Dict[str, List[Tuple]] = {}
+                for nome, *totais in linhas:
+                    por_codigo.setdefault(codigo_por_nome[nome], []).append(tuple(totais))
+                resumos = {}
+                for codigo in ESTADOS_POR_REGIAO[regiao]:
+                    grupos = por_codigo.get(codigo)
+                    if not grupos:
+                        continue
+                    if len(grupos) == 1:
+                        resumos[codigo] = self._resumo(grupos[0])
+                    else:
+                        # O mesmo estado escrito de mais de um jeito: totais recalculados juntos
+                        # (clientes distintos não podem ser somados)
+                        resumos[codigo] = self._resumo(self._agregar(session, Vendas.estado.in_(nomes[codigo]))[0])
+                return resumos
+        return self._em_cache(("estados", regiao), calcular)
+
+    def estoque_regiao(self, regiao: str) -> List[Dict[str, Any]]:
+        """Estoque da primeira venda de cada produto da região, na ordem em que os produtos aparecem."""
+        def calcular():
+            condicao = Vendas.regiao == REGIAO_PARA_NOME_CSV[regiao]
+            primeiras = (
+                select(func.min(Vendas.id).label("id"))
+                .where(condicao)
+                .group_by(Vendas.produto)
+                .subquery()
+            )
+            consulta = (
+                select(Vendas.produto, Vendas.estoque_atual)
+                .join(primeiras, Vendas.id == primeiras.c.id)
+                .order_by(Vendas.id)
+            )
+            with nova_sessao() as session:
+                return [
+                    {"produto": produto, "estoque": estoque or 0}
+                    for produto, estoque in session.exec(consulta).all()
+                ]
+        return self._em_cache(("estoque", regiao), calcular)
+
+    def _celulas(
+        self, session: Session, nivel: int, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+        regiao: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        tamanho = tamanho_celula(nivel)
+        # floor() do PostgreSQL; no SQLite (sem floor) o CAST trunca, e as coordenadas deslocadas são positivas
+        piso = func.floor if session.get_bind().dialect.name == "postgresql" else (lambda valor: cast(valor, Integer))
+        coluna = piso((Vendas.longitude + 180) / tamanho)
+        linha = piso((Vendas.latitude + 90) / tamanho)
+        # Retângulo ampliado até as bordas das células, para as células virem completas
+        linha_inicial, linha_final = (min_lat + 90) // tamanho, (max_lat + 90) // tamanho
+        coluna_inicial, coluna_final = (min_lon + 180) // tamanho, (max_lon + 180) // tamanho
+        condicoes = [
+            Vendas.latitude >= linha_inicial * tamanho - 90,
+            Vendas.latitude < (linha_final + 1) * tamanho - 90,
+            Vendas.longitude >= coluna_inicial * tamanho - 180,
+            Vendas.longitude < (coluna_final + 1) * tamanho - 180,
+        ]
+        if regiao is not None:
+            condicoes.append(Vendas.regiao == REGIAO_PARA_NOME_CSV[regiao])
+        consulta = select(
+            coluna, linha, func.count(Vendas.id), func.coalesce(func.sum(VALOR), 0),
+            func.coalesce(func.sum(Vendas.lucro_total), 0), func.sum(Vendas.latitude), func.sum(Vendas.longitude)
+        ).where(*condicoes).group_by(coluna, linha).order_by(coluna, linha)
+        return [
+            formatar_celula(nivel, int(c), int(l), vendas, faturamento, lucro, soma_lat, soma_lon)
+            for c, l, vendas, faturamento, lucro, soma_lat, soma_lon in session.exec(consulta)
+        ]
+
+    def grade(
+        self, nivel: int, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+        max_celulas: int, regiao: Optional[str] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Vendas agregadas por célula da grade (a mesma do IndiceGeografico) com GROUP BY.
+        Se passarem de `max_celulas`, repete num nível menos detalhado. Retorna (nível, células).
+        """
+        with nova_sessao() as session:
+            celulas = self._celulas(session, nivel, min_lat, min_lon, max_lat, max_lon, regiao)
+            while len(celulas) > max_celulas and nivel > 0:
+                nivel -= 1
+                celulas = self._celulas(session, nivel, min_lat, min_lon, max_lat, max_lon, regiao)
+        return nivel, celulas
+
+    def consultar_regiao(
+        self,
+        regiao: str,
+        estado: Optional[str] = None,
+        produto: Optional[str] = None,
+        cliente: Optional[str] = None,
+        data_inicio: Optional[str] = None,
+        data_fim: Optional[str] = None,
+        ordenar: str = "ID",
+        decrescente: bool = False,
+        cursor: Optional[int] = None,
+        limite: Optional[int] = None,
+        campos: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int, Optional[int]]:
+        """
+        Filtra, ordena e pagina (por keyset) as vendas da região no banco, com a mesma
+        semântica de DataStore.consultar_regiao. Retorna as linhas já no formato do
+        endpoint, o total filtrado e o próximo cursor. Lança ValueError para campos,
+        datas ou cursores inválidos.
+        """
+        if ordenar not in COLUNAS_POR_CHAVE:
+            raise ValueError(f"Campo de ordenação inválido: '{ordenar}'")
+        inicio, fim = ler_data_iso(data_inicio), ler_data_iso(data_fim)
+
+        with nova_sessao() as session:
+            condicoes = [Vendas.regiao == REGIAO_PARA_NOME_CSV[regiao]]
+            if estado is not None:
+                condicoes.append(Vendas.estado.in_(self._nomes_estados(session).get(estado, [])))
+            if produto is not None:
+                condicoes.append(Vendas.produto == produto)
+            if cliente is not None:
+                condicoes.append(Vendas.nome_cliente == cliente)
+            if inicio is not None:
+                condicoes.append(Vendas.data_venda >= inicio)
+            if fim is not None:
+                condicoes.append(Vendas.data_venda <= fim)
+            total = session.exec(select(func.count(Vendas.id)).where(*condicoes)).one()
+
+            chave = EXPRESSOES[COLUNAS_POR_CHAVE[ordenar]]
+            if cursor is not None:
+                # Keyset: linhas depois de (chave, id) da linha do cursor, na ordem pedida
+                linha_cursor = session.exec(
+                    select(chave, Vendas.id).where(Vendas.id == cursor, condicoes[0])
+                ).first()
+                if linha_cursor is None:
+                    raise ValueError(f"Cursor inválido: '{cursor}'")
+                chave_cursor = linha_cursor[0]
+                id_depois = Vendas.id < cursor if decrescente else Vendas.id > cursor
+                if chave_cursor is None:
+                    # Cursor já entre as chaves nulas (as últimas): só elas, depois do id
+                    depois = and_(chave.is_(None), id_depois)
+                else:
+                    chave_depois = chave < chave_cursor if decrescente else chave > chave_cursor
+                    # Comparações com NULL não são verdadeiras: as chaves nulas entram explicitamente
+                    depois = or_(chave_depois, and_(chave == chave_cursor, id_depois), chave.is_(None))
+                condicoes.append(depois)
+
+            # Chaves nulas por último nas duas direções, como no DataStore (o padrão do
+            # PostgreSQL seria pô-las primeiro na ordem decrescente)
+            if decrescente:
+                ordem = [chave.desc().nulls_last(), Vendas.id.desc()]
+            else:
+                ordem = [chave.asc().nulls_last(), Vendas.id.asc()]
+            nomes = campos or list(CHAVES_LEGADAS)
+            consulta = select(
+                *(EXPRESSOES[nome].label(nome) for nome in nomes),
+                # id e nome do estado sempre vêm, para o cursor e o código BR-XX
+                Vendas.id.label("_id"), Vendas.estado.label("_estado"),
+            ).where(*condicoes).order_by(*ordem)
+            if limite is not None:
+                # Uma linha a mais só para saber se há próxima página
+                consulta = consulta.limit(limite + 1)
+
+            linhas = []
+            ultimo_id = None
+            ha_mais = False
+            resultado = session.exec(consulta, execution_options={"yield_per": LINHAS_POR_BUSCA})
+            for linha in resultado:
+                if limite is not None and len(linhas) == limite:
+                    ha_mais = True
+                    break
+                linhas.append(self._formatar_linha(linha._mapping, nomes))
+                ultimo_id = linha._mapping["_id"]
+            resultado.close()
+
+        return linhas, total, ultimo_id if ha_mais else None
+
+    @staticmethod
+    def _formatar_linha(linha, nomes: List[str]) -> Dict[str, Any]:
+        """Uma linha do banco no formato do endpoint (o mesmo de VisaoRegiao.para_dicts)."""
+        item = {}
+        for nome in nomes:
+            valor = linha[nome]
+            if nome == "estado":
+                valor = codigo_estado(linha["_estado"]) if linha["_estado"] else None
+            elif nome == "data":
+                valor = valor.isoformat() if valor is not None else None
+            elif nome in ("latitude", "longitude"):
+                valor = repr(valor) if valor is not None else None
+            item[CHAVES_LEGADAS[nome]] = valor
+        return item